@@ -0,0 +1,28 @@
+"""add leave period index
+
+Revision ID: 3a6d2f8c1e57
+Revises: 7f3b9d2e6c15
+Create Date: 2026-10-18 18:46:12.517904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a6d2f8c1e57'
+down_revision: Union[str, Sequence[str], None] = '7f3b9d2e6c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_leave_requests_period', 'leave_requests', ['start_date', 'end_date', 'status', 'employee_id', 'num_days'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leave_requests_period', table_name='leave_requests')
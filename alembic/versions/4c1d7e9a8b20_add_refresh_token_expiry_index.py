@@ -0,0 +1,28 @@
+"""add refresh token expiry index
+
+Revision ID: 4c1d7e9a8b20
+Revises: 9b3e4f1c2a7d
+Create Date: 2026-10-18 14:05:17.482391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d7e9a8b20'
+down_revision: Union[str, Sequence[str], None] = '9b3e4f1c2a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
@@ -0,0 +1,37 @@
+"""add holidays table
+
+Revision ID: 7f3b9d2e6c15
+Revises: e2a5c3f81d46
+Create Date: 2026-10-18 17:21:44.058310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3b9d2e6c15'
+down_revision: Union[str, Sequence[str], None] = 'e2a5c3f81d46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('holidays',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('region', sa.String(length=50), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('region', 'date', name='uq_holidays_region_date')
+    )
+    op.create_index(op.f('ix_holidays_id'), 'holidays', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_holidays_id'), table_name='holidays')
+    op.drop_table('holidays')
@@ -0,0 +1,28 @@
+"""add leave overlap index
+
+Revision ID: 9b3e4f1c2a7d
+Revises: 631845052755
+Create Date: 2026-10-18 10:12:41.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e4f1c2a7d'
+down_revision: Union[str, Sequence[str], None] = '631845052755'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_leave_requests_overlap', 'leave_requests', ['employee_id', 'status', 'end_date', 'start_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leave_requests_overlap', table_name='leave_requests')
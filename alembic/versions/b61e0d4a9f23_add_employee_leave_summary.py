@@ -0,0 +1,67 @@
+"""add employee leave summary
+
+Revision ID: b61e0d4a9f23
+Revises: 3a6d2f8c1e57
+Create Date: 2026-10-18 19:32:05.881046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61e0d4a9f23'
+down_revision: Union[str, Sequence[str], None] = '3a6d2f8c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('employee_leave_summary',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('pending_requests', sa.Integer(), nullable=False),
+    sa.Column('pending_days', sa.Integer(), nullable=False),
+    sa.Column('approved_requests', sa.Integer(), nullable=False),
+    sa.Column('approved_days', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('employee_id', 'year')
+    )
+
+    # Backfill from existing leaves (same query as crud.rebuild_leave_summaries)
+    leaves = sa.table('leave_requests',
+        sa.column('employee_id', sa.Integer()),
+        sa.column('start_date', sa.Date()),
+        sa.column('num_days', sa.Integer()),
+        sa.column('status', sa.String()),
+    )
+    summary = sa.table('employee_leave_summary',
+        sa.column('employee_id'), sa.column('year'), sa.column('pending_requests'),
+        sa.column('pending_days'), sa.column('approved_requests'), sa.column('approved_days'),
+    )
+    pending = leaves.c.status == 'applied'
+    approved = leaves.c.status == 'approved'
+    year = sa.extract('year', leaves.c.start_date)
+    totals = (
+        sa.select(
+            leaves.c.employee_id,
+            year,
+            sa.func.sum(sa.case((pending, 1), else_=0)),
+            sa.func.sum(sa.case((pending, leaves.c.num_days), else_=0)),
+            sa.func.sum(sa.case((approved, 1), else_=0)),
+            sa.func.sum(sa.case((approved, leaves.c.num_days), else_=0)),
+        )
+        .where(leaves.c.status.in_(['applied', 'approved']))
+        .group_by(leaves.c.employee_id, year)
+    )
+    op.execute(summary.insert().from_select(
+        ['employee_id', 'year', 'pending_requests', 'pending_days', 'approved_requests', 'approved_days'], totals,
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('employee_leave_summary')
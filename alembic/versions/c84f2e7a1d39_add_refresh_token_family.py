@@ -0,0 +1,43 @@
+"""add refresh token family
+
+Revision ID: c84f2e7a1d39
+Revises: b61e0d4a9f23
+Create Date: 2026-10-19 10:14:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84f2e7a1d39'
+down_revision: Union[str, Sequence[str], None] = 'b61e0d4a9f23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.String(length=32), nullable=True))
+    op.add_column('refresh_tokens', sa.Column('used_at', sa.DateTime(), nullable=True))
+    # Each existing row is one session's current token: give each its own family
+    op.execute("UPDATE refresh_tokens SET family_id = 'legacy-' || id")
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('family_id', existing_type=sa.String(length=32), nullable=False)
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_family_id'), ['family_id'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_previous_token_hash'))
+        batch_op.drop_column('previous_token_hash')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The old schema keeps one row per session; drop the used predecessors
+    op.execute("DELETE FROM refresh_tokens WHERE used_at IS NOT NULL")
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('previous_token_hash', sa.String(length=255), nullable=True))
+        batch_op.create_index(batch_op.f('ix_refresh_tokens_previous_token_hash'), ['previous_token_hash'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_refresh_tokens_family_id'))
+        batch_op.drop_column('used_at')
+        batch_op.drop_column('family_id')
@@ -0,0 +1,30 @@
+"""add refresh token previous hash
+
+Revision ID: e2a5c3f81d46
+Revises: 4c1d7e9a8b20
+Create Date: 2026-10-18 15:32:08.916254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a5c3f81d46'
+down_revision: Union[str, Sequence[str], None] = '4c1d7e9a8b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('previous_token_hash', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_refresh_tokens_previous_token_hash'), 'refresh_tokens', ['previous_token_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_previous_token_hash'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'previous_token_hash')
@@ -0,0 +1,29 @@
+"""add employee tokens_revoked_at
+
+Revision ID: f3a9c6d2b481
+Revises: c84f2e7a1d39
+Create Date: 2026-10-19 15:02:11.518930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6d2b481'
+down_revision: Union[str, Sequence[str], None] = 'c84f2e7a1d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('employees', sa.Column('tokens_revoked_at', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('employees') as batch_op:
+        batch_op.drop_column('tokens_revoked_at')
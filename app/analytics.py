@@ -0,0 +1,143 @@
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+from .models import LeaveStatus
+
+
+def _weekmask() -> str:
+    return "".join("0" if day in settings.WEEKEND_DAYS else "1" for day in range(7))
+
+
+def _month_bounds(year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First day of each month of `year`, and first day of the month after."""
+    months = np.arange(f"{year}-01", f"{year + 1}-02", dtype="datetime64[M]").astype("datetime64[D]")
+    return months[:12], months[1:]
+
+
+def split_by_month(rows: List[tuple], year: int, holidays: Iterable[date]) -> Dict[Tuple[str, LeaveStatus], np.ndarray]:
+    """
+    Working days per month of `year` for leaves that cross a month boundary.
+
+    rows are (department, status, start_date, end_date). Each leave is clipped to
+    every month in one broadcast and counted with np.busday_count, then summed into
+    a 12-slot vector per (department, status).
+    """
+    if not rows:
+        return {}
+    departments, statuses, starts, ends = zip(*rows)
+    starts = np.array(starts, dtype="datetime64[D]")
+    ends = np.array(ends, dtype="datetime64[D]")
+    holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+    weekmask = _weekmask()
+
+    keys = sorted(set(zip(departments, statuses)))
+    group_of = {key: i for i, key in enumerate(keys)}
+    groups = np.fromiter((group_of[key] for key in zip(departments, statuses)), dtype=np.intp, count=len(rows))
+
+    month_starts, month_ends = _month_bounds(year)
+    # (leaves x 12) clipped segments; empty segments count as zero days
+    begin = np.maximum(starts[:, None], month_starts[None, :])
+    end = np.minimum(ends[:, None] + 1, month_ends[None, :])
+    days = np.busday_count(begin, np.maximum(begin, end), weekmask=weekmask, holidays=holidays)
+
+    totals = np.zeros((len(keys), 12), dtype=np.int64)
+    np.add.at(totals, groups, days)
+    return {key: totals[i] for i, key in enumerate(keys)}
+
+
+def working_days_per_month(year: int, holidays: Iterable[date]) -> np.ndarray:
+    month_starts, month_ends = _month_bounds(year)
+    holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+    return np.busday_count(month_starts, month_ends, weekmask=_weekmask(), holidays=holidays)
+
+
+def summarize(year: int, employees: List[tuple], monthly: List[tuple], spanning: List[tuple], holidays: Iterable[date]) -> dict:
+    """
+    Assemble the leave summary from the SQL aggregates.
+
+    employees: (department, headcount, average_balance)
+    monthly:   (department, status, month, requests, days) for single-month leaves
+    spanning:  (department, status, start_date, end_date) for the rest
+    """
+    holidays = list(holidays)
+    days = {}
+    requests = {}
+    for department, status, month, count, total in monthly:
+        days.setdefault((department, status), np.zeros(12, dtype=np.int64))[month - 1] += total
+        requests.setdefault((department, status), np.zeros(12, dtype=np.int64))[month - 1] += count
+    for key, split in split_by_month(spanning, year, holidays).items():
+        days.setdefault(key, np.zeros(12, dtype=np.int64))[:] += split
+    # A request is counted in the month it starts (January if it started last year)
+    for department, status, start_date, _ in spanning:
+        month = start_date.month if start_date.year == year else 1
+        requests.setdefault((department, status), np.zeros(12, dtype=np.int64))[month - 1] += 1
+
+    capacity = working_days_per_month(year, holidays)
+    zeros = np.zeros(12, dtype=np.int64)
+    headcounts = {department: (count, balance) for department, count, balance in employees}
+    departments = sorted(set(headcounts) | {department for department, _ in days})
+
+    summary = []
+    for department in departments:
+        headcount, average_balance = headcounts.get(department, (0, None))
+        approved = days.get((department, LeaveStatus.approved), zeros)
+        pending = days.get((department, LeaveStatus.applied), zeros)
+        pending_requests = requests.get((department, LeaveStatus.applied), zeros)
+        available = capacity * headcount
+        utilization = np.divide(approved, available, out=np.zeros(12), where=available > 0)
+        summary.append({
+            "department": department,
+            "employees": headcount,
+            "average_balance": float(average_balance) if average_balance is not None else None,
+            "approved_days": int(approved.sum()),
+            "pending_days": int(pending.sum()),
+            "pending_requests": int(pending_requests.sum()),
+            "months": [
+                {
+                    "month": month + 1,
+                    "approved_days": int(approved[month]),
+                    "pending_days": int(pending[month]),
+                    "pending_requests": int(pending_requests[month]),
+                    "utilization": round(float(utilization[month]), 4),
+                }
+                for month in range(12)
+            ],
+        })
+    return {"year": year, "departments": summary}
+
+
+class SummaryCache:
+    """Leave summaries by (year, department) for ANALYTICS_CACHE_TTL_SECONDS; cleared on any leave change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[int, Optional[str]], Tuple[float, dict]] = {}
+        # Bumped by clear(); a summary computed across a clear() is not stored
+        self.generation = 0
+
+    def get(self, year: int, department: Optional[str]) -> Optional[dict]:
+        entry = self._entries.get((year, department))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, year: int, department: Optional[str], summary: dict, generation: int) -> None:
+        if settings.ANALYTICS_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(year, department)] = (time.monotonic() + settings.ANALYTICS_CACHE_TTL_SECONDS, summary)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+summary_cache = SummaryCache()
@@ -1,43 +1,264 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Optional
-import secrets, hashlib
-import string
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import secrets, hashlib, hmac
+import base64
+import json
+import logging
+import threading
+import time
 
 from .config import settings
-from .database import get_db
-from . import crud
+from .database import get_async_db
+from . import crud, crud_async
 from .models import Role
+from .principals import Principal, principal_cache, revocations
+# Moved to password_policy; re-exported so auth.validate_password_strength keeps working
+from .password_policy import validate_password_strength  # noqa: F401
 
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """The argon2 CryptContext, built on first use so importing auth stays cheap."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+class TokenError(Exception):
+    """A token that is malformed, wrongly signed or outside its validity window."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+def _check_time_claims(claims: dict, now: int) -> None:
+    """exp and nbf, with python-jose's semantics (whole seconds, no leeway)."""
+    for name in ("exp", "nbf"):
+        value = claims.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise TokenError(f"{name} claim must be a number")
+    if "exp" in claims and claims["exp"] < now:
+        raise TokenError("token has expired")
+    if "nbf" in claims and claims["nbf"] > now:
+        raise TokenError("token is not yet valid")
+
+
+class HMACCodec:
+    """
+    HS256/384/512 JWTs on the standard library alone. The secret is keyed into an
+    hmac object once; each token signs with a copy, which skips re-deriving the
+    inner/outer pads. Tokens are interchangeable with the other codecs'.
+    """
+
+    name = "hmac"
+    _DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, secret: str, algorithm: str):
+        digest = self._DIGESTS.get(algorithm)
+        if digest is None:
+            raise ValueError(f"TOKEN_BACKEND=hmac supports {', '.join(self._DIGESTS)}, not {algorithm}; use jose")
+        self.algorithm = algorithm
+        self._mac = hmac.new(secret.encode(), digestmod=digest)
+        self._header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        signing_input = self._header + b"." + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict:
+        try:
+            raw = token.encode("ascii")
+            if raw.count(b".") != 2:
+                raise TokenError("not a JWS compact token")
+            signing_input, _, signature = raw.rpartition(b".")
+            header_segment, _, claims_segment = signing_input.partition(b".")
+            header = json.loads(_b64decode(header_segment))
+            if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+                raise TokenError("algorithm not allowed")
+            if not hmac.compare_digest(self._sign(signing_input), _b64decode(signature)):
+                raise TokenError("signature verification failed")
+            claims = json.loads(_b64decode(claims_segment))
+        except ValueError as exc:  # bad base64, JSON or non-ASCII input
+            raise TokenError(str(exc)) from exc
+        if not isinstance(claims, dict):
+            raise TokenError("claims must be a JSON object")
+        _check_time_claims(claims, int(time.time()))
+        return claims
+
+
+class JoseCodec:
+    """python-jose, for any algorithm it supports; the key object is constructed once."""
+
+    name = "jose"
+
+    def __init__(self, secret: str, algorithm: str):
+        from jose import JWTError, jwk, jwt
+        self._jwt, self._error = jwt, JWTError
+        self.algorithm = algorithm
+        self._key = jwk.construct(secret, algorithm)
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self._key, algorithms=[self.algorithm])
+        except self._error as exc:
+            raise TokenError(str(exc)) from exc
+
+
+class PyJWTCodec:
+    """PyJWT (optional dependency: pip install PyJWT)."""
+
+    name = "pyjwt"
+
+    def __init__(self, secret: str, algorithm: str):
+        try:
+            import jwt
+        except ImportError as exc:
+            raise RuntimeError("TOKEN_BACKEND=pyjwt requires PyJWT (pip install PyJWT)") from exc
+        self._jwt, self._error = jwt, jwt.PyJWTError
+        self.algorithm = algorithm
+        self._key = jwt.get_algorithm_by_name(algorithm).prepare_key(secret)
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            # PyJWT would otherwise insist that sub is a string and iat an integer
+            return self._jwt.decode(token, self._key, algorithms=[self.algorithm],
+                                    options={"verify_sub": False, "verify_iat": False})
+        except self._error as exc:
+            raise TokenError(str(exc)) from exc
+
+
+TOKEN_CODECS = {codec.name: codec for codec in (HMACCodec, JoseCodec, PyJWTCodec)}
+
+
+class VerifiedTokenCache:
+    """
+    Claims of recently verified access tokens, keyed by the token's SHA-256 so a
+    client re-presenting the same bearer token skips signature verification.
+    Bounded LRU; an entry is dropped once its token's exp passes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at < int(time.time()):
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers may add to the dict; the cached claims must stay as verified
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        # Without exp there is nothing to bound the entry's lifetime
+        if exp is None or settings.TOKEN_CACHE_SIZE <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": settings.TOKEN_CACHE_SIZE,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+token_cache = VerifiedTokenCache()
+_codec: Dict[str, object] = {}
+
+def get_token_codec():
+    """The codec for the current TOKEN_BACKEND / SECRET_KEY / ALGORITHM, built once per combination."""
+    config = (settings.TOKEN_BACKEND, settings.SECRET_KEY, settings.ALGORITHM)
+    if _codec.get("config") != config:
+        backend = TOKEN_CODECS.get(settings.TOKEN_BACKEND)
+        if backend is None:
+            raise ValueError(f"Unknown TOKEN_BACKEND {settings.TOKEN_BACKEND!r}; expected one of {', '.join(TOKEN_CODECS)}")
+        codec = backend(settings.SECRET_KEY, settings.ALGORITHM)
+        # Tokens verified under the old key must be verified again
+        token_cache.clear()
+        _codec.update(config=config, codec=codec)
+    return _codec["codec"]
+
 def create_access_token(data: dict, expires_delta: timedelta|None = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({'exp':expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY,algorithm=settings.ALGORITHM)
+    now = time.time()
+    lifetime = expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({'exp': int(now + lifetime.total_seconds()), 'iat': now})
+    return get_token_codec().encode(to_encode)
 
 def decode_token(token: str):
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    codec = get_token_codec()
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
-    except JWTError:
+    try:
+        payload = codec.decode(token)
+    except TokenError:
         return None
-    
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    token_cache.put(token, payload)
+    return payload
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     payload = decode_token(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token")
@@ -46,13 +267,56 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if email is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token")
     
-    user = crud.get_employee_by_email(db, email)
+    user = principal_cache.get(email)
+    if user is None:
+        row = await crud_async.get_employee_principal_row(db, email)
+        if row is not None:
+            user = Principal(*row)
+            principal_cache.put(email, user)
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive or not found")
     return user
 
+def token_claims(employee) -> dict:
+    """Claims embedded in an access token; enough to authorize without a DB lookup."""
+    return {
+        "sub": employee.email,
+        "id": employee.id,
+        "role": employee.role,
+        "is_active": employee.is_active,
+    }
+
+async def get_token_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Authorize from access-token claims alone when AUTH_STATELESS is on.
+    Deactivated or revoked employees are caught via the revocation list, which every
+    process re-reads from the employees table (see principals.RevocationList).
+    Falls back to the DB lookup of get_current_user otherwise (or for older tokens).
+    """
+    if not settings.AUTH_STATELESS:
+        return await get_current_user(token, db)
+
+    payload = decode_token(token)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token")
+    if any(k not in payload for k in ("sub", "id", "role", "is_active", "iat")):
+        return await get_current_user(token, db)
+
+    principal = Principal(
+        id=payload["id"],
+        email=payload["sub"],
+        role=Role(payload["role"]),
+        is_active=payload["is_active"],
+    )
+    if revocations.needs_refresh():
+        revocations.load(await crud_async.list_token_revocations(db, revocations.horizon()))
+    if not principal.is_active or revocations.is_revoked(principal.id, payload["iat"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive or not found")
+    return principal
+
 def require_role(allowed_roles: List[Role]):
-    def role_checker(current_user = Depends(get_current_user)):
+    # async so manager-only routes do not hop to the threadpool for the check
+    async def role_checker(current_user = Depends(get_current_user)):
         if current_user.role not in allowed_roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail = "You do not have permission for this action")
         
@@ -74,65 +338,24 @@ def create_and_store_refresh_token(db: Session, user_id: int) -> str:
     crud.create_refresh_token(db, user_id=user_id, token_hash=token_hash, expires_at=expires_at)
     return raw_token
 
-def verify_refresh_token(db: Session, raw_token: str):
-    """Check refresh token validity and return user if valid, else None."""
+def rotate_refresh_token(db: Session, raw_token: str):
+    """
+    Replace a valid refresh token with a new one; return (principal, new raw token) or None.
+    Presenting a token that was already rotated away revokes the whole session (token family).
+    """
     token_hash = hash_refresh_token(raw_token)
-    rt = crud.get_refresh_token_by_hash(db, token_hash)
-    if not rt or rt.expires_at < datetime.utcnow():
+    new_raw_token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    owner = crud.rotate_refresh_token(db, token_hash, hash_refresh_token(new_raw_token), expires_at, now)
+    if owner is None:
+        user_id = crud.revoke_refresh_token_family(db, token_hash)
+        if user_id is not None:
+            logger.warning("Refresh token reuse detected for employee %s; session revoked", user_id)
         return None
-    return rt.user
+    return Principal(*owner), new_raw_token
 
 def revoke_refresh_token(db: Session, raw_token: str) -> bool:
-    """Revoke (delete) a refresh token from DB."""
+    """Revoke the session (token family) a live refresh token belongs to."""
     token_hash = hash_refresh_token(raw_token)
     return crud.revoke_refresh_token(db, token_hash)
-
-
-def validate_password_strength(
-    password: str,
-    *,
-    min_length: int = 8,
-    max_length: int = 128,
-    require_upper: bool = True,
-    require_lower: bool = True,
-    require_digit: bool = True,
-    require_special: bool = True,
-) -> None:
-    """
-    Validate password according to policy. Raises ValueError with a clear message
-    if validation fails. Returns None on success.
-    """
-    if password is None:
-        raise ValueError("Password must be provided.")
-
-    errors: List[str] = []
-
-    plen = len(password)
-    if plen < min_length:
-        errors.append(f"Password must be at least {min_length} characters.")
-    if plen > max_length:
-        errors.append(f"Password must be at most {max_length} characters.")
-
-    # Leading/trailing whitespace is usually a source of confusion
-    if password != password.strip():
-        errors.append("Password must not have leading or trailing spaces.")
-
-    # Unicode-aware checks using str methods:
-    if require_lower and not any(c.islower() for c in password):
-        errors.append("Password must include at least one lowercase letter.")
-    if require_upper and not any(c.isupper() for c in password):
-        errors.append("Password must include at least one uppercase letter.")
-    if require_digit and not any(c.isdigit() for c in password):
-        errors.append("Password must include at least one digit.")
-
-    # Special character check: prefer string.punctuation (ASCII) but fallback to
-    # "non-alnum and non-space" to catch other punctuation.
-    if require_special:
-        if not any(c in string.punctuation for c in password) and not any(
-            (not c.isalnum() and not c.isspace()) for c in password
-        ):
-            errors.append("Password must include at least one special character (e.g. !@#$%).")
-
-    if errors:
-        # Combine into one message so client sees everything wrong at once
-        raise ValueError(" ".join(errors))
\ No newline at end of file
@@ -1,14 +1,100 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./lms.db" 
     DEFAULT_LEAVE_BALANCE: int = 20
 
+    # Leave is counted in working days: weekdays (Mon=0 .. Sun=6) in WEEKEND_DAYS and
+    # the region's holidays are not deducted from the balance
+    WEEKEND_DAYS: List[int] = [5, 6]
+    HOLIDAY_REGION: str = "default"
+    # Cached per-year working-day tables are rebuilt this often (holiday edits in other processes)
+    BUSINESS_CALENDAR_TTL_SECONDS: int = 300
+
+    # Read replicas for GET endpoints (JSON list in the env); empty = read from the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    # A caller's reads stay on the primary this long after their last write. The write
+    # time travels in a short-lived cookie, so every worker process honours it
+    READ_YOUR_WRITES_SECONDS: float = 5
+    READ_YOUR_WRITES_COOKIE: str = "last_write"
+
+    # Connection pool (ignored for in-memory SQLite, which uses a single connection)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Pragmas applied to every new SQLite connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+
     SECRET_KEY: str = "secret_key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # Access-token codec (app/auth.py): "hmac" (standard library, HS* only),
+    # "jose" (python-jose, any algorithm) or "pyjwt" (needs PyJWT installed)
+    TOKEN_BACKEND: str = "hmac"
+    # Recently verified access tokens whose signature check is skipped (0 disables)
+    TOKEN_CACHE_SIZE: int = 4096
 
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # A rotated-away token is kept this long so replaying it revokes the session;
+    # after that the sweeper deletes it and a replay is just an unknown token
+    REFRESH_TOKEN_REUSE_WINDOW_SECONDS: int = 3600
+    # Background purge of expired refresh tokens (interval 0 disables it)
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: int = 300
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = 1000
+
+    # Authorize hot read endpoints from access-token claims without a DB lookup
+    AUTH_STATELESS: bool = False
+    # How stale the deactivated-employee list used in stateless mode may get
+    REVOCATION_REFRESH_SECONDS: int = 30
+
+    # Resolved principals cached by token subject; TTL is capped below the token lifetime
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Password hashing pool (0 workers = hash on a thread instead of a process)
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_MAX_PENDING: int = 64
+    # Bulk imports hash on their own pool so a large import never queues ahead of logins
+    HASH_IMPORT_POOL_WORKERS: int = 1
+
+    # Rows validated, deduplicated, hashed and inserted together by the bulk import
+    IMPORT_CHUNK_SIZE: int = 500
+
+    # Rows fetched per round trip by the NDJSON exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Department leave calendars are reloaded from the DB this often to pick up
+    # writes made by other worker processes
+    LEAVE_CALENDAR_TTL_SECONDS: int = 300
+
+    # Leave summaries are cached this long; any leave apply/decision clears them
+    ANALYTICS_CACHE_TTL_SECONDS: int = 60
+
+    # Serialized employee/balance responses behind ETags; crud invalidates them
+    # on change, the TTL covers changes made by other worker processes
+    RESPONSE_CACHE_SIZE: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+
+    # Rate-limit counters (app/ratelimit.py). lru-memory:// is per process; with
+    # several workers use sqlite:////dev/shm/lms-ratelimit.db so they share counts
+    RATE_LIMIT_STORAGE_URI: str = "lru-memory://"
+    # Keys kept before the least recently hit are evicted
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # /auth/token attempts per client IP, and per account (email) from any IP
+    LOGIN_RATE_LIMIT: str = "5/minute"
+    LOGIN_ACCOUNT_RATE_LIMIT: str = "10/minute"
+
+    # What a route exceeding its SQL statement budget (app/query_budget.py) does:
+    # "log", "raise" (the test suite) or "off"
+    QUERY_BUDGET_MODE: str = "log"
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
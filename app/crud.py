@@ -1,11 +1,22 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, delete, and_, bindparam, case, func, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import hashlib
-from datetime import datetime, timedelta
+import secrets
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 from . import models
 from .config import settings
 from . import auth
+from . import principals
+from .leave_calendar import CalendarEntry, leave_calendar
+from .workdays import business_calendar
+from . import analytics
+from .response_cache import response_cache
 from .models import RefreshToken
 
 
@@ -13,9 +24,17 @@ from .models import RefreshToken
 def daterange_inclusive_days(start_date,end_date):
     return (end_date - start_date).days + 1
 
+def working_days(db: Session, start_date, end_date, region: str | None = None):
+    """Days in [start_date, end_date] that are neither weekend nor a holiday in the region."""
+    return business_calendar.count(
+        start_date, end_date, region or settings.HOLIDAY_REGION,
+        lambda r, year: holiday_dates(db, r, year),
+    )
+
 
-def create_refresh_token(db: Session, user_id: int, token_hash: str, expires_at: datetime):
-    rt = RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
+def create_refresh_token(db: Session, user_id: int, token_hash: str, expires_at: datetime, family_id: str | None = None):
+    # No family_id means a new session (a login)
+    rt = RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at, family_id=family_id or secrets.token_hex(16))
     db.add(rt)
     db.commit()
     db.refresh(rt)
@@ -25,31 +44,95 @@ def get_refresh_token_by_hash(db: Session, token_hash: str):
     stmt = select(RefreshToken).where(RefreshToken.token_hash == token_hash)
     return db.execute(stmt).scalar_one_or_none()
 
+def rotate_refresh_token(db: Session, token_hash: str, new_token_hash: str, expires_at: datetime, now: datetime):
+    """
+    Mark a live refresh token used and issue its successor in the same session (family).
+    The used row now expires after REFRESH_TOKEN_REUSE_WINDOW_SECONDS: long enough for
+    a replay to be recognised, short enough for the sweeper to keep the table bounded.
+    Returns the owner's (id, email, role, is_active), or None if the token is unknown, used or expired.
+    """
+    Employee = models.Employee
+
+    def owner(column):
+        # SQLite cannot RETURNING columns of a joined table; a correlated subquery works on both
+        return select(column).where(Employee.id == RefreshToken.user_id).scalar_subquery()
+
+    # The used_at IS NULL guard makes the claim a compare-and-set: of two concurrent
+    # refreshes with one token, only one gets a row back
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_(None), RefreshToken.expires_at > now)
+        .values(used_at=now, expires_at=now + timedelta(seconds=settings.REFRESH_TOKEN_REUSE_WINDOW_SECONDS))
+        .returning(RefreshToken.user_id, RefreshToken.family_id, owner(Employee.email), owner(Employee.role), owner(Employee.is_active))
+    ).one_or_none()
+    if claimed is None:
+        db.rollback()
+        return None
+    user_id, family_id, email, role, is_active = claimed
+    db.execute(insert(RefreshToken).values(
+        user_id=user_id, family_id=family_id, token_hash=new_token_hash, expires_at=expires_at,
+    ))
+    db.commit()
+    return user_id, email, role, is_active
+
+def revoke_refresh_token_family(db: Session, token_hash: str):
+    """
+    If this token was already rotated away, delete its whole session: every token
+    issued since the login, however many rotations ago the replayed one was.
+    Returns the session's user_id, or None if the token was not a used one.
+    """
+    family = (
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None))
+        .scalar_subquery()
+    )
+    user_ids = db.execute(
+        delete(RefreshToken).where(RefreshToken.family_id == family).returning(RefreshToken.user_id)
+    ).scalars().all()
+    db.commit()
+    return user_ids[0] if user_ids else None
+
 def revoke_refresh_token(db: Session, token_hash: str):
-    rt = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).one_or_none()
-    if rt:
-        db.delete(rt)
-        db.commit()
-        return True
-    return False
-
-def delete_expired_refresh_tokens(db: Session):
-    now = datetime.utcnow()
-    stmt = select(RefreshToken).where(RefreshToken.expires_at < now)
-    results = db.execute(stmt).scalars().all()
-    for rt in results:
-        db.delete(rt)
+    """Log out: delete the session a live token belongs to, including its used predecessors."""
+    family = (
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_(None))
+        .scalar_subquery()
+    )
+    result = db.execute(delete(RefreshToken).where(RefreshToken.family_id == family))
     db.commit()
+    return result.rowcount > 0
+
+def delete_expired_refresh_tokens_batch(db: Session, now: datetime, limit: int) -> int:
+    """Delete up to `limit` expired tokens in one statement; returns the rows removed."""
+    # DELETE ... LIMIT is not portable (SQLite needs a compile flag, Postgres lacks it),
+    # so bound the chunk with an id subquery instead
+    expired_ids = select(RefreshToken.id).where(RefreshToken.expires_at < now).limit(limit)
+    result = db.execute(delete(RefreshToken).where(RefreshToken.id.in_(expired_ids)))
+    db.commit()
+    return result.rowcount
+
+def delete_expired_refresh_tokens(db: Session, batch_size: int = 1000) -> int:
+    now = datetime.utcnow()
+    total = 0
+    while True:
+        purged = delete_expired_refresh_tokens_batch(db, now, batch_size)
+        total += purged
+        if purged < batch_size:
+            return total
 
 # ---------- EMPLOYEE ----------
-def create_employee(db:Session, *, name:str, email:str, department:str, joining_date, password:str, role: models.Role = models.Role.employee):
+def create_employee(db:Session, *, name:str, email:str, department:str, joining_date, password:str|None = None, role: models.Role = models.Role.employee, password_hash:str|None = None):
+    # Callers that already hashed off-thread pass password_hash instead of password
+    if password_hash is None:
+        password_hash = auth.hash_password(password)
     employee = models.Employee(
         name = name,
         email = email, 
         department = department,
         joining_date = joining_date,
         leave_balance = settings.DEFAULT_LEAVE_BALANCE,
-        password_hash = auth.hash_password(password),
+        password_hash = password_hash,
         role=role
     )
     db.add(employee)
@@ -64,34 +147,94 @@ def get_employee_by_email(db:Session, email:str):
     stmt = select(models.Employee).where(models.Employee.email == email)
     return db.execute(stmt).scalar_one_or_none()
 
-def list_employees(db:Session, skip:int =0, limit:int = 100):
-    stmt = select(models.Employee).offset(skip).limit(limit)
+def existing_emails(db:Session, emails):
+    stmt = select(models.Employee.email).where(models.Employee.email.in_(emails))
+    return set(db.execute(stmt).scalars())
+
+def bulk_insert_employees(db:Session, rows):
+    """Insert many employees (dicts carrying password_hash) in one multi-row INSERT."""
+    if not rows:
+        return
+    for row in rows:
+        row.setdefault("leave_balance", settings.DEFAULT_LEAVE_BALANCE)
+        row.setdefault("is_active", True)
+    db.execute(insert(models.Employee).values(rows))
+    db.commit()
+
+def get_employee_principal_row(db:Session, email:str):
+    """Only the columns needed to authorize a request: (id, email, role, is_active)."""
+    stmt = select(models.Employee.id, models.Employee.email, models.Employee.role, models.Employee.is_active).where(models.Employee.email == email)
+    return db.execute(stmt).one_or_none()
+
+def update_employee(db:Session, employee:models.Employee, *, role: models.Role | None = None, is_active: bool | None = None):
+    if role is not None:
+        employee.role = role
+    if is_active is not None:
+        employee.is_active = is_active
+    # Cached principals and issued tokens still carry the old role/active flag
+    employee.tokens_revoked_at = time.time()
+    db.commit()
+    db.refresh(employee)
+    principals.invalidate_employee(employee.id, employee.email)
+    response_cache.bump(employee.id)
+    return employee
+
+def list_token_revocations(db:Session, since: float):
+    """(id, is_active, tokens_revoked_at) of deactivated employees and of those whose tokens were revoked after `since`."""
+    Employee = models.Employee
+    stmt = select(Employee.id, Employee.is_active, Employee.tokens_revoked_at).where(
+        (Employee.is_active.is_(False)) | (Employee.tokens_revoked_at >= since)
+    )
+    return db.execute(stmt).all()
+
+def list_employees(db:Session, skip:int =0, limit:int = 100, after_id:int|None = None):
+    # Ordered by id so pages are stable; after_id switches to keyset pagination
+    stmt = select(models.Employee).order_by(models.Employee.id)
+    if after_id is not None:
+        stmt = stmt.where(models.Employee.id > after_id)
+    stmt = stmt.offset(skip).limit(limit)
     return db.execute(stmt).scalars().all()
 
 
 # ---------- LEAVES ----------
 def has_overlapping_leave(db:Session, employee_id:int, start_date, end_date):
-    stmt = select(models.LeaveRequest).where(
+    # EXISTS stops at the first match in ix_leave_requests_overlap instead of
+    # materializing a row; cost stays flat as an employee's history grows
+    stmt = select(select(models.LeaveRequest.id).where(
         models.LeaveRequest.employee_id == employee_id,
         models.LeaveRequest.status.in_([models.LeaveStatus.applied, models.LeaveStatus.approved]),
         and_(models.LeaveRequest.start_date <= end_date,
              models.LeaveRequest.end_date >= start_date)
-    )
-    return db.execute(stmt).first() is not None
+    ).exists())
+    return db.scalar(stmt)
 
 def apply_leave(db:Session, employee:models.Employee, start_date, end_date):
 
     if start_date < employee.joining_date:
         raise ValueError("Cannot apply for leave before joining date")
+
+    # Lock the employee row (where the backend supports it) so concurrent applies
+    # for the same employee serialize: the overlap and balance checks below then
+    # cannot interleave with another apply's insert
+    leave_balance = db.execute(
+        select(models.Employee.leave_balance).where(models.Employee.id == employee.id).with_for_update()
+    ).scalar_one()
     if has_overlapping_leave(db, employee.id, start_date, end_date):
+        db.rollback()
         raise ValueError("Overlapping leave request exists")
 
-    num_days = daterange_inclusive_days(start_date, end_date)
-    if num_days <= 0:
+    if start_date > end_date:
+        db.rollback()
         raise ValueError("Invalid date range")
-    if employee.leave_balance < num_days:
+    num_days = working_days(db, start_date, end_date)
+    if num_days <= 0:
+        db.rollback()
+        raise ValueError("Leave range contains no working days")
+    if leave_balance < num_days:
+        db.rollback()
         raise ValueError("Requested days exceed leave balance")
 
+    department, name = employee.department, employee.name
     leave = models.LeaveRequest(
         employee_id = employee.id,
         start_date = start_date,
@@ -100,38 +243,411 @@ def apply_leave(db:Session, employee:models.Employee, start_date, end_date):
         status = models.LeaveStatus.applied
     )
     db.add(leave)
+    _bump_leave_summary(db, employee.id, start_date.year, pending_requests=1, pending_days=num_days)
     db.commit()
     db.refresh(leave)
+    leave_calendar.add(department, CalendarEntry(leave.id, leave.employee_id, name, start_date, end_date, leave.status))
+    analytics.summary_cache.clear()
+    response_cache.bump(leave.employee_id)
     return leave
 
 def get_leave(db: Session, leave_id: int):
     return db.get(models.LeaveRequest, leave_id)
 
-def list_leaves_for_employee(db: Session, employee_id: int, skip: int = 0, limit: int = 100):
-    stmt = select(models.LeaveRequest).where(models.LeaveRequest.employee_id == employee_id).offset(skip).limit(limit)
+def list_leaves_for_employee(db: Session, employee_id: int, skip: int = 0, limit: int = 100, after_id: int | None = None):
+    stmt = select(models.LeaveRequest).where(models.LeaveRequest.employee_id == employee_id).order_by(models.LeaveRequest.id)
+    if after_id is not None:
+        stmt = stmt.where(models.LeaveRequest.id > after_id)
+    stmt = stmt.offset(skip).limit(limit)
     return db.execute(stmt).scalars().all()
 
-def approve_leave(db:Session, leave:models.LeaveRequest, employee:models.Employee):
-    if leave.status == models.LeaveStatus.rejected:
-        raise ValueError("Cannot approve an already rejected leave")
-    if leave.status == models.LeaveStatus.approved:
-        raise ValueError("Cannot approve an already approved leave")
-    
-    employee.leave_balance -= leave.num_days
-    leave.status = models.LeaveStatus.approved
+def _claim_leave(db:Session, leave:models.LeaveRequest, new_status:models.LeaveStatus, verb:str):
+    """Compare-and-set applied -> new_status; raises ValueError if another decision won."""
+    if leave.status != models.LeaveStatus.applied:
+        raise ValueError(f"Cannot {verb} an already {leave.status.value} leave")
+
+    claimed = db.execute(
+        update(models.LeaveRequest)
+        .where(models.LeaveRequest.id == leave.id, models.LeaveRequest.status == models.LeaveStatus.applied)
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        current = db.scalar(select(models.LeaveRequest.status).where(models.LeaveRequest.id == leave.id))
+        raise ValueError(f"Cannot {verb} an already {current.value} leave")
+
+def approve_leave(db:Session, leave:models.LeaveRequest):
+    """
+    Approve an applied leave and deduct its days; returns the new balance.
 
+    Both writes are conditional single statements, so concurrent approvals can
+    neither approve the same leave twice nor lose a balance update.
+    """
+    _claim_leave(db, leave, models.LeaveStatus.approved, "approve")
+
+    new_balance = db.execute(
+        update(models.Employee)
+        .where(models.Employee.id == leave.employee_id, models.Employee.leave_balance >= leave.num_days)
+        .values(leave_balance=models.Employee.leave_balance - leave.num_days)
+        .returning(models.Employee.leave_balance)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if new_balance is None:
+        db.rollback()
+        raise ValueError("Insufficient leave balance")
+
+    _bump_leave_summary(db, leave.employee_id, leave.start_date.year, **_decided(leave.num_days, approved=True))
     db.commit()
-    db.refresh(leave)
-    db.refresh(employee)
-    return leave, employee.leave_balance
+    leave_calendar.set_status(leave.id, models.LeaveStatus.approved)
+    analytics.summary_cache.clear()
+    response_cache.bump(leave.employee_id)
+    return new_balance
 
 def reject_leave(db:Session, leave:models.LeaveRequest):
-    if leave.status == models.LeaveStatus.rejected:
-        raise ValueError("Cannot reject an already rejected leave")
-    if leave.status == models.LeaveStatus.approved:
-        raise ValueError("Cannot reject an already approved leave")
-    
-    leave.status = models.LeaveStatus.rejected
+    _claim_leave(db, leave, models.LeaveStatus.rejected, "reject")
+    _bump_leave_summary(db, leave.employee_id, leave.start_date.year, **_decided(leave.num_days, approved=False))
     db.commit()
+    leave_calendar.discard(leave.id)
+    analytics.summary_cache.clear()
     db.refresh(leave)
-    return leave
\ No newline at end of file
+    response_cache.bump(leave.employee_id)
+    return leave
+
+def bulk_decide_leaves(db:Session, decisions):
+    """
+    Apply many (leave_id, approve?) decisions in one transaction.
+
+    The writes are the same conditional statements as approve_leave: leaves
+    are claimed only while still applied, and each employee's summed deduction
+    only lands while the balance still covers it. Items that lose either race
+    to a concurrent decision are reported as "skipped".
+    Returns one result dict per decision.
+    """
+    Leave, Employee = models.LeaveRequest, models.Employee
+    leave_ids = {leave_id for leave_id, _ in decisions}
+    leaves = {
+        row.id: row
+        for row in db.execute(
+            select(Leave.id, Leave.employee_id, Leave.status, Leave.num_days, Leave.start_date).where(Leave.id.in_(leave_ids))
+        )
+    }
+    employee_ids = {leave.employee_id for leave in leaves.values()}
+    balances = dict(db.execute(select(Employee.id, Employee.leave_balance).where(Employee.id.in_(employee_ids))).all())
+
+    # Plan against the rows just read; a later item sees the earlier items' decisions
+    statuses = {leave_id: leave.status for leave_id, leave in leaves.items()}
+    planned = defaultdict(int)
+    results = []
+    for leave_id, approve in decisions:
+        leave = leaves.get(leave_id)
+        if leave is None:
+            results.append({"leave_id": leave_id, "result": "not_found"})
+            continue
+        result = {"leave_id": leave_id, "status": statuses[leave_id], "employee_id": leave.employee_id}
+        if statuses[leave_id] == models.LeaveStatus.approved:
+            result["result"] = "already_approved"
+        elif statuses[leave_id] == models.LeaveStatus.rejected:
+            result["result"] = "already_rejected"
+        elif approve and balances[leave.employee_id] - planned[leave.employee_id] < leave.num_days:
+            result["result"] = "insufficient_balance"
+        else:
+            if approve:
+                planned[leave.employee_id] += leave.num_days
+            statuses[leave_id] = models.LeaveStatus.approved if approve else models.LeaveStatus.rejected
+            result.update(result="ok", status=statuses[leave_id])
+        results.append(result)
+
+    decided = {r["leave_id"]: r["status"] for r in results if r["result"] == "ok"}
+    claimed = set()
+    if decided:
+        approved_ids = [leave_id for leave_id, status in decided.items() if status == models.LeaveStatus.approved]
+        claimed.update(db.scalars(
+            update(Leave)
+            .where(Leave.id.in_(decided), Leave.status == models.LeaveStatus.applied)
+            .values(status=case((Leave.id.in_(approved_ids), models.LeaveStatus.approved), else_=models.LeaveStatus.rejected))
+            .returning(Leave.id)
+            .execution_options(synchronize_session=False)
+        ))
+
+    approved_by_employee = defaultdict(list)
+    for r in results:
+        if r["result"] == "ok" and r["status"] == models.LeaveStatus.approved and r["leave_id"] in claimed:
+            approved_by_employee[r["employee_id"]].append(r["leave_id"])
+    for employee_id, ids in approved_by_employee.items():
+        days = sum(leaves[leave_id].num_days for leave_id in ids)
+        new_balance = db.execute(
+            update(Employee)
+            .where(Employee.id == employee_id, Employee.leave_balance >= days)
+            .values(leave_balance=Employee.leave_balance - days)
+            .returning(Employee.leave_balance)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if new_balance is None:
+            # A concurrent approval spent the balance: hand this employee's claims back
+            db.execute(
+                update(Leave).where(Leave.id.in_(ids)).values(status=models.LeaveStatus.applied)
+                .execution_options(synchronize_session=False)
+            )
+            claimed.difference_update(ids)
+        else:
+            balances[employee_id] = new_balance
+
+    summary_deltas = defaultdict(Counter)
+    for r in results:
+        if r["result"] != "ok":
+            continue
+        if r["leave_id"] not in claimed:
+            r.update(result="skipped", status=None)
+            continue
+        leave = leaves[r["leave_id"]]
+        approved = r["status"] == models.LeaveStatus.approved
+        summary_deltas[(leave.employee_id, leave.start_date.year)].update(_decided(leave.num_days, approved=approved))
+    for (employee_id, year), deltas in summary_deltas.items():
+        _bump_leave_summary(db, employee_id, year, **deltas)
+    db.commit()
+
+    for result in results:
+        if "employee_id" in result:
+            result["updated_leave_balance"] = balances[result["employee_id"]]
+        if result["result"] == "ok":
+            if result["status"] == models.LeaveStatus.approved:
+                leave_calendar.set_status(result["leave_id"], models.LeaveStatus.approved)
+            else:
+                leave_calendar.discard(result["leave_id"])
+    analytics.summary_cache.clear()
+    response_cache.bump(*balances)
+    return results
+
+def bulk_insert_leaves(db: Session, rows):
+    """
+    Insert many leave rows (dicts with num_days already computed) in executemany batches.
+    Seeding/backfill only: no overlap or balance checks, and employee_leave_summary
+    is not touched, so run rebuild_leave_summaries afterwards.
+    """
+    if not rows:
+        return
+    db.execute(insert(models.LeaveRequest), rows)
+    db.commit()
+    leave_calendar.clear()
+    analytics.summary_cache.clear()
+
+def department_calendar_rows(db: Session, department: str):
+    """Applied and approved leaves of a department, shaped for leave_calendar.load."""
+    stmt = (
+        select(
+            models.LeaveRequest.id, models.LeaveRequest.employee_id, models.Employee.name,
+            models.LeaveRequest.start_date, models.LeaveRequest.end_date, models.LeaveRequest.status,
+        )
+        .join(models.Employee, models.Employee.id == models.LeaveRequest.employee_id)
+        .where(
+            models.Employee.department == department,
+            models.LeaveRequest.status.in_([models.LeaveStatus.applied, models.LeaveStatus.approved]),
+        )
+    )
+    return db.execute(stmt).all()
+
+
+# ---------- LEAVE SUMMARY ----------
+# employee_leave_summary is written in the same transaction as the leave change
+# it reflects, so it never disagrees with leave_requests after a commit
+def _decided(num_days: int, approved: bool):
+    """Summary deltas for one applied leave being approved or rejected."""
+    deltas = {"pending_requests": -1, "pending_days": -num_days}
+    if approved:
+        deltas.update(approved_requests=1, approved_days=num_days)
+    return deltas
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _bump_leave_summary(db: Session, employee_id: int, year: int, **deltas):
+    """Add deltas to an employee/year row, creating it on that year's first leave."""
+    Summary = models.EmployeeLeaveSummary
+    row = dict.fromkeys(("pending_requests", "pending_days", "approved_requests", "approved_days"), 0)
+    row.update(deltas)
+    # One INSERT ... ON CONFLICT DO UPDATE: approvals and rejections take no employee
+    # row lock, so a separate "UPDATE, else INSERT" could race into a duplicate key
+    stmt = _UPSERT_INSERTS[db.get_bind().dialect.name](Summary).values(employee_id=employee_id, year=year, **row)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Summary.employee_id, Summary.year],
+        set_={column: getattr(Summary, column) + getattr(stmt.excluded, column) for column in row},
+    ))
+
+@lru_cache(maxsize=None)
+def _balance_stmt():
+    # Built once with bind parameters: constructing this SELECT costs more
+    # than the two primary-key lookups it runs
+    Employee, Summary = models.Employee, models.EmployeeLeaveSummary
+    return (
+        select(
+            Employee.id.label("employee_id"),
+            Employee.leave_balance,
+            func.coalesce(func.sum(Summary.pending_requests), 0).label("pending_requests"),
+            func.coalesce(func.sum(Summary.pending_days), 0).label("pending_days"),
+            func.coalesce(func.sum(case((Summary.year == bindparam("year"), Summary.approved_days), else_=0)), 0).label("approved_days_ytd"),
+        )
+        .outerjoin(Summary, Summary.employee_id == Employee.id)
+        .where(Employee.id == bindparam("employee_id"))
+        .group_by(Employee.id, Employee.leave_balance)
+    )
+
+def get_balance(db: Session, employee_id: int, year: int):
+    """
+    (employee_id, leave_balance, pending_requests, pending_days, approved_days_ytd)
+    in one statement: a primary-key lookup on employees plus a primary-key range
+    on employee_leave_summary. None if the employee does not exist.
+    """
+    return db.execute(_balance_stmt(), {"employee_id": employee_id, "year": year}).one_or_none()
+
+def rebuild_leave_summaries(db: Session) -> int:
+    """Recompute employee_leave_summary from leave_requests with one INSERT ... SELECT; returns rows written."""
+    Summary, Leave = models.EmployeeLeaveSummary, models.LeaveRequest
+    pending = Leave.status == models.LeaveStatus.applied
+    approved = Leave.status == models.LeaveStatus.approved
+    year = func.extract("year", Leave.start_date)
+    totals = (
+        select(
+            Leave.employee_id,
+            year,
+            func.sum(case((pending, 1), else_=0)),
+            func.sum(case((pending, Leave.num_days), else_=0)),
+            func.sum(case((approved, 1), else_=0)),
+            func.sum(case((approved, Leave.num_days), else_=0)),
+        )
+        .where(Leave.status.in_([models.LeaveStatus.applied, models.LeaveStatus.approved]))
+        .group_by(Leave.employee_id, year)
+    )
+    db.execute(delete(Summary))
+    db.execute(
+        insert(Summary).from_select(
+            ["employee_id", "year", "pending_requests", "pending_days", "approved_requests", "approved_days"],
+            totals,
+        )
+    )
+    count = db.scalar(select(func.count()).select_from(Summary))
+    db.commit()
+    response_cache.clear()
+    return count
+
+
+# ---------- ANALYTICS ----------
+def leave_summary(db: Session, year: int, department: str | None = None):
+    """
+    Per-department, per-month leave statistics for one year.
+    Leaves inside a single month are grouped in SQL; the few that cross a month
+    boundary are fetched individually and split across months by analytics.
+    """
+    return analytics.summarize(year, **leave_summary_rows(db, year, department))
+
+
+def leave_summary_rows(db: Session, year: int, department: str | None = None) -> dict:
+    """The query half of leave_summary: analytics.summarize's keyword arguments."""
+    year_start = date(year, 1, 1)
+    Employee, Leave = models.Employee, models.LeaveRequest
+
+    employees = select(Employee.department, func.count(Employee.id), func.avg(Employee.leave_balance)).where(Employee.is_active.is_(True))
+    if department is not None:
+        employees = employees.where(Employee.department == department)
+    employees = employees.group_by(Employee.department)
+
+    leaves = (
+        select()
+        .select_from(Leave)
+        .join(Employee, Employee.id == Leave.employee_id)
+        .where(Leave.status.in_([models.LeaveStatus.applied, models.LeaveStatus.approved]))
+    )
+    if department is not None:
+        leaves = leaves.where(Employee.department == department)
+
+    # One range per month instead of extracting the month from every row: each
+    # part is a seek on ix_leave_requests_period and groups only a few keys
+    monthly, spanning = [], [
+        leaves.add_columns(Employee.department, Leave.status, Leave.start_date, Leave.end_date)
+        .where(Leave.start_date < year_start, Leave.end_date >= year_start)
+    ]
+    for month in range(1, 13):
+        first = date(year, month, 1)
+        after = date(year + month // 12, month % 12 + 1, 1)
+        started = leaves.where(Leave.start_date >= first, Leave.start_date < after)
+        monthly.append(
+            started.add_columns(Employee.department, Leave.status, literal(month), func.count(Leave.id), func.sum(Leave.num_days))
+            .where(Leave.end_date < after)
+            .group_by(Employee.department, Leave.status)
+        )
+        spanning.append(
+            started.add_columns(Employee.department, Leave.status, Leave.start_date, Leave.end_date)
+            .where(Leave.end_date >= after)
+        )
+
+    return {
+        "employees": db.execute(employees).all(),
+        "monthly": db.execute(union_all(*monthly)).all(),
+        "spanning": db.execute(union_all(*spanning)).all(),
+        "holidays": holiday_dates(db, settings.HOLIDAY_REGION, year),
+    }
+
+
+# ---------- HOLIDAYS ----------
+def holiday_dates(db: Session, region: str, year: int):
+    stmt = select(models.Holiday.date).where(
+        models.Holiday.region == region,
+        models.Holiday.date >= date(year, 1, 1),
+        models.Holiday.date <= date(year, 12, 31),
+    )
+    return db.execute(stmt).scalars().all()
+
+def list_holidays(db: Session, region: str, year: int | None = None):
+    stmt = select(models.Holiday).where(models.Holiday.region == region).order_by(models.Holiday.date)
+    if year is not None:
+        stmt = stmt.where(models.Holiday.date >= date(year, 1, 1), models.Holiday.date <= date(year, 12, 31))
+    return db.execute(stmt).scalars().all()
+
+def get_holiday(db: Session, holiday_id: int):
+    return db.get(models.Holiday, holiday_id)
+
+def create_holiday(db: Session, *, region: str, day, name: str):
+    holiday = models.Holiday(region=region, date=day, name=name)
+    db.add(holiday)
+    db.commit()
+    db.refresh(holiday)
+    # That year's working-day table no longer matches
+    business_calendar.invalidate(region, day.year)
+    return holiday
+
+def delete_holiday(db: Session, holiday: models.Holiday):
+    region, year = holiday.region, holiday.date.year
+    db.delete(holiday)
+    db.commit()
+    business_calendar.invalidate(region, year)
+
+
+# ---------- EXPORT ----------
+def employee_export_query(department: str | None = None, joined_from=None, joined_to=None):
+    """Column-only select for the employee export (no ORM identity map overhead)."""
+    stmt = select(
+        models.Employee.id, models.Employee.name, models.Employee.email, models.Employee.department,
+        models.Employee.joining_date, models.Employee.leave_balance, models.Employee.role, models.Employee.is_active,
+    ).order_by(models.Employee.id)
+    if department is not None:
+        stmt = stmt.where(models.Employee.department == department)
+    if joined_from is not None:
+        stmt = stmt.where(models.Employee.joining_date >= joined_from)
+    if joined_to is not None:
+        stmt = stmt.where(models.Employee.joining_date <= joined_to)
+    return stmt
+
+def leave_export_query(department: str | None = None, status: models.LeaveStatus | None = None, date_from=None, date_to=None):
+    """Column-only select for the leave export; the date range matches overlapping leaves."""
+    stmt = select(
+        models.LeaveRequest.id, models.LeaveRequest.employee_id, models.Employee.department,
+        models.LeaveRequest.start_date, models.LeaveRequest.end_date, models.LeaveRequest.num_days, models.LeaveRequest.status,
+    ).join(models.Employee, models.Employee.id == models.LeaveRequest.employee_id).order_by(models.LeaveRequest.id)
+    if department is not None:
+        stmt = stmt.where(models.Employee.department == department)
+    if status is not None:
+        stmt = stmt.where(models.LeaveRequest.status == status)
+    if date_from is not None:
+        stmt = stmt.where(models.LeaveRequest.end_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(models.LeaveRequest.start_date <= date_to)
+    return stmt
@@ -0,0 +1,87 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from . import analytics, crud
+
+
+# Async counterparts of app.crud for the request handlers.
+# Each one runs the sync implementation through AsyncSession.run_sync, so the
+# query logic lives in one place while the I/O goes through the async driver
+# and never blocks the event loop.
+
+# ---------- REFRESH TOKENS ----------
+async def delete_expired_refresh_tokens_batch(db: AsyncSession, now, limit: int):
+    return await db.run_sync(crud.delete_expired_refresh_tokens_batch, now, limit)
+
+
+# ---------- EMPLOYEE ----------
+async def create_employee(db: AsyncSession, **fields):
+    return await db.run_sync(lambda session: crud.create_employee(session, **fields))
+
+async def get_employee(db: AsyncSession, employee_id: int):
+    return await db.run_sync(crud.get_employee, employee_id)
+
+async def get_employee_by_email(db: AsyncSession, email: str):
+    return await db.run_sync(crud.get_employee_by_email, email)
+
+async def get_employee_principal_row(db: AsyncSession, email: str):
+    return await db.run_sync(crud.get_employee_principal_row, email)
+
+async def update_employee(db: AsyncSession, employee, *, role=None, is_active=None):
+    return await db.run_sync(lambda session: crud.update_employee(session, employee, role=role, is_active=is_active))
+
+async def list_token_revocations(db: AsyncSession, since: float):
+    return await db.run_sync(crud.list_token_revocations, since)
+
+async def list_employees(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None):
+    return await db.run_sync(crud.list_employees, skip, limit, after_id)
+
+
+# ---------- LEAVES ----------
+async def apply_leave(db: AsyncSession, employee, start_date, end_date):
+    return await db.run_sync(crud.apply_leave, employee, start_date, end_date)
+
+async def get_leave(db: AsyncSession, leave_id: int):
+    return await db.run_sync(crud.get_leave, leave_id)
+
+async def list_leaves_for_employee(db: AsyncSession, employee_id: int, skip: int = 0, limit: int = 100, after_id: int | None = None):
+    return await db.run_sync(crud.list_leaves_for_employee, employee_id, skip, limit, after_id)
+
+async def approve_leave(db: AsyncSession, leave):
+    return await db.run_sync(crud.approve_leave, leave)
+
+async def reject_leave(db: AsyncSession, leave):
+    return await db.run_sync(crud.reject_leave, leave)
+
+async def bulk_decide_leaves(db: AsyncSession, decisions):
+    return await db.run_sync(crud.bulk_decide_leaves, decisions)
+
+async def department_calendar_rows(db: AsyncSession, department: str):
+    return await db.run_sync(crud.department_calendar_rows, department)
+
+
+# ---------- LEAVE SUMMARY ----------
+async def get_balance(db: AsyncSession, employee_id: int, year: int):
+    return await db.run_sync(crud.get_balance, employee_id, year)
+
+
+# ---------- ANALYTICS ----------
+async def leave_summary(db: AsyncSession, year: int, department: str | None = None):
+    rows = await db.run_sync(crud.leave_summary_rows, year, department)
+    # run_sync executes on the event loop thread; the NumPy month split is CPU
+    # work that would stall every other request, so it runs on the threadpool
+    return await run_in_threadpool(analytics.summarize, year, **rows)
+
+
+# ---------- HOLIDAYS ----------
+async def list_holidays(db: AsyncSession, region: str, year: int | None = None):
+    return await db.run_sync(crud.list_holidays, region, year)
+
+async def get_holiday(db: AsyncSession, holiday_id: int):
+    return await db.run_sync(crud.get_holiday, holiday_id)
+
+async def create_holiday(db: AsyncSession, **fields):
+    return await db.run_sync(lambda session: crud.create_holiday(session, **fields))
+
+async def delete_holiday(db: AsyncSession, holiday):
+    return await db.run_sync(crud.delete_holiday, holiday)
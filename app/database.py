@@ -1,15 +1,217 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+
+# starlette's Request is the class fastapi re-exports; importing it directly keeps
+# models (and Alembic's env.py) from loading all of FastAPI
+from starlette.requests import Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+# Async driver used for each backend when DATABASE_URL names a sync one
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None or parsed.get_driver_name() == driver:
+        return url
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+# ---------- Pool metrics ----------
+class PoolMetrics:
+    """Checkout counts and time spent waiting for a free connection, per pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.in_use = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "in_use": self.in_use,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+# keyed by the pool's logging name ("primary", "primary_async", ...)
+pool_metrics = {}
+
+
+class _TimedPoolMixin:
+    # QueuePool exposes no "waiting for a connection" event, so time _do_get,
+    # the step that blocks when the pool and its overflow are exhausted
+    def _do_get(self):
+        metrics = pool_metrics.get(self.logging_name)
+        if metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            # Only an exhausted pool is a timeout; connect errors propagate uncounted
+            metrics.record_wait(0.0, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return record
+
+    def _do_return_conn(self, record):
+        metrics = pool_metrics.get(self.logging_name)
+        if metrics is not None:
+            metrics.record_checkin()
+        super()._do_return_conn(record)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# ---------- Engines ----------
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return _is_sqlite(url) and parsed.database in (None, "", ":memory:")
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """connect-event listener: tune every new SQLite connection for concurrent writers."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    finally:
+        cursor.close()
+
+def _pool_options(url: str, name: str, is_async: bool) -> dict:
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if not _is_memory_sqlite(url):
+        pool_metrics.setdefault(name, PoolMetrics())
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_logging_name=name,
+        )
+    return options
+
+def make_engine(url: str, name: str = "primary"):
+    """Sync engine with the configured pool and, for SQLite, the connect-time pragmas."""
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if _is_sqlite(url) else {},
+        **_pool_options(url, name, is_async=False),
+    )
+    if _is_sqlite(url):
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+def make_async_engine(url: str, name: str = "primary_async"):
+    """Async counterpart of make_engine; url is mapped to the async driver."""
+    url = async_url(url)
+    engine = create_async_engine(url, **_pool_options(url, name, is_async=True))
+    if _is_sqlite(url):
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return engine
+
+engine = make_engine(settings.DATABASE_URL)
 
 # Session factory - each request gets its own database session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine over the same database, used by the request handlers.
+# expire_on_commit=False: attributes must not reload lazily outside the event loop's awaits
+async_engine = make_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# ---------- Read replicas ----------
+class ReadRouter:
+    """
+    Round-robin over replica session factories for read-only handlers.
+
+    A caller that wrote within READ_YOUR_WRITES_SECONDS keeps reading from the
+    primary so replica lag never hides their own change. The caller carries
+    the write time (see main.read_your_writes), not this process: the write
+    and the next read may land on different workers.
+    """
+
+    def __init__(self, primary, replicas=()):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_sticky(last_write: Optional[str]) -> bool:
+        """True if `last_write` (epoch seconds, as set in the cookie) is within READ_YOUR_WRITES_SECONDS."""
+        try:
+            written_at = float(last_write)
+        except (TypeError, ValueError):
+            return False
+        # abs(): another host's clock may run slightly ahead of this one
+        return abs(time.time() - written_at) < settings.READ_YOUR_WRITES_SECONDS
+
+    def session_factory(self, last_write: Optional[str] = None):
+        if not self.replicas or self.is_sticky(last_write):
+            return self.primary
+        with self._lock:
+            self._turn += 1
+            return self.replicas[self._turn % len(self.replicas)]
+
+replica_engines = [
+    make_async_engine(url, name=f"replica{i}_async") for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+read_router = ReadRouter(
+    AsyncSessionLocal,
+    [async_sessionmaker(e, autoflush=False, expire_on_commit=False) for e in replica_engines],
+)
+
 # Base Class for ORM models
 class Base(DeclarativeBase):
     pass
@@ -20,3 +222,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_sessionmaker(request: Request):
+    """
+    Session factory for read-only work, served by a replica when any are configured
+    and the caller has not written within READ_YOUR_WRITES_SECONDS.
+    """
+    return read_router.session_factory(request.cookies.get(settings.READ_YOUR_WRITES_COOKIE))
+
+async def get_read_db(request: Request):
+    """Session for read-only handlers, from get_read_sessionmaker."""
+    async with get_read_sessionmaker(request)() as db:
+        yield db
@@ -0,0 +1,31 @@
+import json
+from datetime import date, datetime
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from .config import settings
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+async def stream_ndjson(session_factory: async_sessionmaker, stmt) -> AsyncIterator[bytes]:
+    """
+    Yield stmt's rows as NDJSON, one batch of EXPORT_BATCH_SIZE rows at a time.
+
+    db.stream() reads from a server-side cursor where the driver has one, so
+    memory stays flat however many rows match. The body streams after the
+    request's dependencies have been cleaned up, so the generator opens (and
+    closes) a session of its own rather than borrowing the request's.
+    """
+    db = session_factory()
+    try:
+        result = await db.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.mappings().partitions():
+            yield "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in rows).encode()
+    finally:
+        await db.close()
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+
+from .config import settings
+from . import auth, metrics
+
+
+# argon2 is CPU and memory hard, so it runs in a separate process pool instead of
+# on the request thread. The pools are created lazily on first use: one for
+# request-time hash/verify calls, one for bulk imports.
+_executor: Optional[Executor] = None
+_import_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def get_executor() -> Optional[Executor]:
+    """Return the shared hashing pool (None means the loop's default thread pool)."""
+    global _executor
+    if settings.HASH_POOL_WORKERS <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=settings.HASH_POOL_WORKERS)
+    return _executor
+
+
+def get_import_executor() -> Optional[Executor]:
+    """Return the bulk-import hashing pool (None means hash on the calling thread)."""
+    global _import_executor
+    if settings.HASH_IMPORT_POOL_WORKERS <= 0:
+        return None
+    if _import_executor is None:
+        with _executor_lock:
+            if _import_executor is None:
+                _import_executor = ProcessPoolExecutor(max_workers=settings.HASH_IMPORT_POOL_WORKERS)
+    return _import_executor
+
+
+def shutdown_executor() -> None:
+    """Stop the hashing pools; called on application shutdown."""
+    global _executor, _import_executor
+    with _executor_lock:
+        for executor in (_executor, _import_executor):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        _executor = _import_executor = None
+
+
+async def _run(fn, *args):
+    global _pending
+    # Fail fast instead of queueing unbounded work behind a login storm
+    if _pending >= settings.HASH_POOL_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+def pending() -> int:
+    """Number of hash/verify calls currently queued or running."""
+    return _pending
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(auth.hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    # Timed here rather than inside auth.verify_password: the call runs in a pool process
+    started = time.perf_counter()
+    try:
+        return await _run(auth.verify_password, plain_password, hashed_password)
+    finally:
+        metrics.password_verify.observe(time.perf_counter() - started)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash a batch in parallel, blocking the caller (bulk import).
+    Runs on the import pool, never the login pool, so HASH_POOL_MAX_PENDING
+    admission for logins is unaffected by the size of an import.
+    """
+    executor = get_import_executor()
+    if executor is None or len(passwords) < 2:
+        return [auth.hash_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (settings.HASH_IMPORT_POOL_WORKERS * 4))
+    return list(executor.map(auth.hash_password, passwords, chunksize=chunksize))
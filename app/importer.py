@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import crud, hashing, schemas
+from .config import settings
+
+
+# ---------- Parsing ----------
+def iter_csv_rows(fileobj: BinaryIO) -> Iterator[dict]:
+    """Yield one dict per CSV data row, reading the upload incrementally."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def iter_ndjson_rows(fileobj: BinaryIO) -> Iterator[dict]:
+    """Yield one object per NDJSON line; undecodable lines are yielded as errors."""
+    for line in fileobj:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = ValueError(f"Invalid JSON: {e}")
+        yield row
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+# ---------- Import ----------
+def _insert_chunk(db: Session, chunk: List[Tuple[int, schemas.EmployeeRegister]], report: dict) -> None:
+    existing = crud.existing_emails(db, [emp.email for _, emp in chunk])
+    fresh = []
+    for row_no, emp in chunk:
+        if emp.email in existing:
+            report["errors"].append({"row": row_no, "email": emp.email, "error": "Email already exist"})
+        else:
+            fresh.append((row_no, emp))
+    if not fresh:
+        return
+
+    hashes = hashing.hash_passwords([emp.password for _, emp in fresh])
+    rows = [
+        {
+            "name": emp.name,
+            "email": emp.email,
+            "department": emp.department,
+            "joining_date": emp.joining_date,
+            "role": emp.role,
+            "password_hash": password_hash,
+        }
+        for (_, emp), password_hash in zip(fresh, hashes)
+    ]
+    try:
+        crud.bulk_insert_employees(db, rows)
+        report["created"] += len(rows)
+    except IntegrityError:
+        # Someone else inserted one of these emails meanwhile: fall back to row by row
+        db.rollback()
+        for (row_no, emp), row in zip(fresh, rows):
+            try:
+                crud.bulk_insert_employees(db, [row])
+                report["created"] += 1
+            except IntegrityError:
+                db.rollback()
+                report["errors"].append({"row": row_no, "email": emp.email, "error": "Email already exist"})
+
+
+def import_employees(db: Session, rows: Iterable) -> dict:
+    """
+    Validate rows with EmployeeRegister and insert them in chunks of IMPORT_CHUNK_SIZE.
+    Returns {"created": n, "errors": [{"row", "email", "error"}]}; rows are 1-based.
+    """
+    report = {"created": 0, "errors": []}
+    seen = set()
+    chunk: List[Tuple[int, schemas.EmployeeRegister]] = []
+
+    for row_no, raw in enumerate(rows, start=1):
+        if isinstance(raw, Exception):
+            report["errors"].append({"row": row_no, "email": None, "error": str(raw)})
+            continue
+        if not isinstance(raw, dict):
+            report["errors"].append({"row": row_no, "email": None, "error": "Row must be an object"})
+            continue
+        try:
+            emp = schemas.EmployeeRegister.model_validate(raw)
+        except ValidationError as e:
+            report["errors"].append({"row": row_no, "email": raw.get("email"), "error": _format_validation_error(e)})
+            continue
+        if emp.email in seen:
+            report["errors"].append({"row": row_no, "email": emp.email, "error": "Duplicate email in upload"})
+            continue
+        seen.add(emp.email)
+
+        chunk.append((row_no, emp))
+        if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+            _insert_chunk(db, chunk, report)
+            chunk = []
+
+    if chunk:
+        _insert_chunk(db, chunk, report)
+    return report
@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+from .models import LeaveStatus
+
+
+@dataclass(slots=True)
+class CalendarEntry:
+    leave_id: int
+    employee_id: int
+    employee_name: str
+    start_date: date
+    end_date: date
+    status: LeaveStatus
+
+
+class _DepartmentIndex:
+    """
+    Applied/approved leaves of one department, sorted by start date.
+
+    A leave overlapping [from, to] starts no later than `to` and no earlier
+    than `from - max_span`, so a query is two bisects plus a scan of that
+    slice: O(log n + k), k being the leaves starting inside the window.
+    """
+
+    def __init__(self, entries: Iterable[CalendarEntry]):
+        self.entries: Dict[int, CalendarEntry] = {e.leave_id: e for e in entries}
+        self.keys: List[Tuple[int, int]] = sorted((e.start_date.toordinal(), e.leave_id) for e in self.entries.values())
+        # Longest leave seen; never shrinks on removal, which only widens the scan
+        self.max_span = max(((e.end_date - e.start_date).days for e in self.entries.values()), default=0)
+        self.loaded_at = time.monotonic()
+
+    def add(self, entry: CalendarEntry) -> None:
+        self.discard(entry.leave_id)
+        self.entries[entry.leave_id] = entry
+        insort(self.keys, (entry.start_date.toordinal(), entry.leave_id))
+        self.max_span = max(self.max_span, (entry.end_date - entry.start_date).days)
+
+    def discard(self, leave_id: int) -> None:
+        entry = self.entries.pop(leave_id, None)
+        if entry is not None:
+            key = (entry.start_date.toordinal(), leave_id)
+            del self.keys[bisect_left(self.keys, key)]
+
+    def query(self, date_from: date, date_to: date) -> List[CalendarEntry]:
+        lo = bisect_left(self.keys, (date_from.toordinal() - self.max_span,))
+        hi = bisect_left(self.keys, (date_to.toordinal() + 1,))
+        found = []
+        for _, leave_id in self.keys[lo:hi]:
+            entry = self.entries[leave_id]
+            if entry.end_date >= date_from:
+                found.append(entry)
+        return found
+
+
+class LeaveCalendar:
+    """
+    Per-department interval indexes of applied and approved leaves.
+
+    A department is loaded from the DB on first query and then kept current
+    by the leave writes in crud. Writes made by other processes are picked up
+    when the department is reloaded after LEAVE_CALENDAR_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._departments: Dict[str, _DepartmentIndex] = {}
+        self._department_of: Dict[int, str] = {}
+        # Writes seen while a department is being loaded, replayed onto the fresh index
+        self._pending: Dict[str, list] = {}
+
+    def query(self, department: str, date_from: date, date_to: date) -> Optional[List[CalendarEntry]]:
+        """Leaves overlapping [date_from, date_to], or None if the department must be (re)loaded."""
+        with self._lock:
+            index = self._departments.get(department)
+            if index is None or time.monotonic() - index.loaded_at >= settings.LEAVE_CALENDAR_TTL_SECONDS:
+                return None
+            return index.query(date_from, date_to)
+
+    def begin_load(self, department: str) -> None:
+        """Call before reading the department's rows so concurrent writes are not lost."""
+        with self._lock:
+            self._pending.setdefault(department, [])
+
+    def abandon_load(self, department: str) -> None:
+        with self._lock:
+            self._pending.pop(department, None)
+
+    def load(self, department: str, rows: Iterable[tuple]) -> None:
+        """Install a department from (leave_id, employee_id, employee_name, start_date, end_date, status) rows."""
+        index = _DepartmentIndex(CalendarEntry(*row) for row in rows)
+        with self._lock:
+            old = self._departments.get(department)
+            if old is not None:
+                for leave_id in old.entries:
+                    self._department_of.pop(leave_id, None)
+            for op, arg in self._pending.pop(department, []):
+                if op == "add":
+                    index.add(arg)
+                elif op == "discard":
+                    index.discard(arg)
+                elif arg[0] in index.entries:
+                    index.entries[arg[0]].status = arg[1]
+            self._departments[department] = index
+            for leave_id in index.entries:
+                self._department_of[leave_id] = department
+
+    def add(self, department: str, entry: CalendarEntry) -> None:
+        with self._lock:
+            if department in self._pending:
+                self._pending[department].append(("add", entry))
+            index = self._departments.get(department)
+            if index is not None:
+                index.add(entry)
+                self._department_of[entry.leave_id] = department
+
+    def set_status(self, leave_id: int, status: LeaveStatus) -> None:
+        with self._lock:
+            for ops in self._pending.values():
+                ops.append(("status", (leave_id, status)))
+            department = self._department_of.get(leave_id)
+            if department is not None:
+                self._departments[department].entries[leave_id].status = status
+
+    def discard(self, leave_id: int) -> None:
+        with self._lock:
+            for ops in self._pending.values():
+                ops.append(("discard", leave_id))
+            department = self._department_of.pop(leave_id, None)
+            if department is not None:
+                self._departments[department].discard(leave_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._departments.clear()
+            self._department_of.clear()
+            self._pending.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "departments": len(self._departments),
+                "leaves": len(self._department_of),
+            }
+
+
+leave_calendar = LeaveCalendar()
@@ -0,0 +1,23 @@
+"""
+Rebuild employee_leave_summary from leave_requests.
+
+crud keeps the table current as leaves change; run this after loading leaves
+outside the API (bulk SQL, restores) or if the table is ever suspected to drift.
+
+    python -m app.leave_summaries
+"""
+import time
+
+from . import crud
+from .database import SessionLocal
+
+
+def main():
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        rows = crud.rebuild_leave_summaries(db)
+    print(f"rebuilt {rows} employee_leave_summary rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
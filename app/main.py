@@ -1,31 +1,76 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, UploadFile, File, Query
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from typing import List
-from datetime import timedelta
+from typing import List, Optional
+from datetime import date, timedelta
+from contextlib import asynccontextmanager
+import math
+import time
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
+from limits import parse
 
-from . import schemas, crud
-from .database import get_db
-from . import auth
+from . import schemas, crud, crud_async
+from .database import get_db, get_async_db, get_read_db, get_read_sessionmaker, pool_metrics, read_router
+from . import auth, export, hashing, importer, metrics, pagination, query_budget
+from . import ratelimit  # registers the lru-memory:// and sqlite:// limiter storages
 from .config import settings
-from .models import Role
+from .models import Role, LeaveStatus
+from .principals import principal_cache
+from .leave_calendar import leave_calendar
+from .analytics import summary_cache
+from .response_cache import CachedResponse, etag_matches, response_cache
+from .sweeper import refresh_token_sweeper
 
-app = FastAPI(title="Leave Management System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresh_token_sweeper.start()
+    yield
+    await refresh_token_sweeper.stop()
+    hashing.shutdown_executor()
 
-limiter = Limiter(key_func=get_remote_address)
+
+app = FastAPI(title="Leave Management System", lifespan=lifespan)
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy="sliding-window-counter",
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    storage_options={"max_keys": settings.RATE_LIMIT_MAX_KEYS},
+)
+# Per-account login limit; the email is only known once the form is parsed
+login_account_limit = parse(settings.LOGIN_ACCOUNT_RATE_LIMIT)
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # A caller's successful write pins their reads to the primary for READ_YOUR_WRITES_SECONDS.
+    # The marker lives on the client so the next read is routed right by whichever worker gets it;
+    # anonymous writes (login, refresh, register) have no reads of their own to protect
+    response = await call_next(request)
+    wrote = request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400
+    if read_router.replicas and wrote and "authorization" in request.headers:
+        response.set_cookie(
+            settings.READ_YOUR_WRITES_COOKIE, f"{time.time():.3f}",
+            max_age=max(1, math.ceil(settings.READ_YOUR_WRITES_SECONDS)), httponly=True, samesite="lax",
+        )
+    return response
+
+# Added last so it is outermost and times the other middleware too
+app.add_middleware(metrics.MetricsMiddleware, on_complete=query_budget.enforce)
+
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request, exc: RateLimitExceeded):
     return JSONResponse(
@@ -34,40 +79,67 @@ async def rate_limit_handler(request, exc: RateLimitExceeded):
     )
 
 
+def _decode_cursor(after: Optional[str], skip: int = 0):
+    if after is None:
+        return None
+    # An offset on top of a keyset position has no defined meaning
+    if skip:
+        raise HTTPException(status_code=400, detail="skip cannot be combined with after")
+    try:
+        return pagination.decode_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _set_next_cursor(response: Response, rows, limit: int):
+    # Pass the value back as ?after= to fetch the next page
+    cursor = pagination.next_cursor(rows, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+
+
 @app.post("/auth/register",response_model=schemas.EmployeeOut, status_code=status.HTTP_201_CREATED)
-def register(payload: schemas.EmployeeSelfRegister, db: Session = Depends(get_db)):
-    if crud.get_employee_by_email(db, payload.email):
+async def register(payload: schemas.EmployeeSelfRegister, db: AsyncSession = Depends(get_async_db)):
+    if await crud_async.get_employee_by_email(db, payload.email):
         raise HTTPException(status_code=400, detail="Email already exist")
-    
-    emp = crud.create_employee(
+
+    # Release the connection while argon2 runs in the hashing pool
+    await db.close()
+    password_hash = await hashing.hash_password_async(payload.password)
+
+    emp = await crud_async.create_employee(
         db,
         name=payload.name,
         email=payload.email,
         department=payload.department,
         joining_date=payload.joining_date,
-        password=payload.password,
+        password_hash=password_hash,
         role=schemas.Role.employee
     )
     return emp
 
 
 @app.post("/auth/token", response_model=schemas.Token)
-@limiter.limit("5/minute")
-def login(request:Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    emp = crud.get_employee_by_email(db, form_data.username)
+@limiter.limit(settings.LOGIN_RATE_LIMIT)
+async def login(request:Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    # Checked before the DB and the password hash, so stuffing one account from many IPs stays cheap
+    if limiter.enabled and not limiter.limiter.hit(login_account_limit, "login-account", form_data.username.strip().lower()):
+        raise HTTPException(status_code=429, detail="Too many login attempts. Please try again later.")
+    emp = await crud_async.get_employee_by_email(db, form_data.username)
     if not emp:
         raise HTTPException(status_code=401, detail="Invalid Credentials")
     
-    if not auth.verify_password(form_data.password, emp.password_hash):
+    # close() keeps emp's loaded attributes but hands the connection back to the pool
+    await db.close()
+    if not await hashing.verify_password_async(form_data.password, emp.password_hash):
         raise HTTPException(status_code=401, detail="Invalid Credentials")
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data = {"sub":emp.email, "role":emp.role},
+        data = auth.token_claims(emp),
         expires_delta= access_token_expires
         )
     
-    refresh_token = auth.create_and_store_refresh_token(db, emp.id)
+    refresh_token = await db.run_sync(auth.create_and_store_refresh_token, emp.id)
 
     return {
         "access_token": access_token,
@@ -76,21 +148,20 @@ def login(request:Request, form_data: OAuth2PasswordRequestForm = Depends(), db:
     }
 
 @app.post("/auth/refresh", response_model=schemas.Token)
-def refresh_token(payload: schemas.RefreshRequest, db: Session = Depends(get_db)):
-    user = auth.verify_refresh_token(db, payload.refresh_token)
-    if not user:
+async def refresh_token(payload: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    # The old token is swapped for the new one in the same statement, so it stops working here
+    rotated = await db.run_sync(auth.rotate_refresh_token, payload.refresh_token)
+    if not rotated:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    user, new_refresh_token = rotated
 
     # New access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
-        data={"sub": user.email, "role": user.role},
+        data=auth.token_claims(user),
         expires_delta=access_token_expires,
     )
 
-    # Optionally: rotate refresh token here (invalidate old one, issue new one)
-    new_refresh_token = auth.create_and_store_refresh_token(db, user.id)
-
     return {
         "access_token": access_token,
         "refresh_token": new_refresh_token,
@@ -98,103 +169,260 @@ def refresh_token(payload: schemas.RefreshRequest, db: Session = Depends(get_db)
     }
 
 @app.post("/auth/logout")
-def logout(payload: schemas.RefreshRequest, db: Session = Depends(get_db)):
-    revoked = auth.revoke_refresh_token(db, payload.refresh_token)
+async def logout(payload: schemas.RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    revoked = await db.run_sync(auth.revoke_refresh_token, payload.refresh_token)
     if not revoked:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
     return {"message": "Logged out successfully"}
 
 
 @app.post("/employees",response_model=schemas.EmployeeOut, status_code=status.HTTP_201_CREATED)
-def add_employee(payload: schemas.EmployeeRegister, db: Session = Depends(get_db), current_user = Depends(auth.require_role([Role.manager]))):
-    if crud.get_employee_by_email(db, payload.email):
+async def add_employee(payload: schemas.EmployeeRegister, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    if await crud_async.get_employee_by_email(db, payload.email):
         raise HTTPException(status_code=400, detail="Email already exist")
-    emp = crud.create_employee(
+    await db.close()
+    password_hash = await hashing.hash_password_async(payload.password)
+
+    emp = await crud_async.create_employee(
         db,
         name=payload.name,
         email=payload.email,
         department=payload.department,
         joining_date=payload.joining_date,
-        password=payload.password,
+        password_hash=password_hash,
         role=payload.role
     )
     return emp
 
+# Stays sync: parsing the upload and waiting on the hashing pool would block the event loop
+@app.post("/employees/import", response_model=schemas.ImportReport)
+def import_employees(file: UploadFile = File(...), db: Session = Depends(get_db), current_user = Depends(auth.require_role([Role.manager]))):
+    filename = (file.filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or file.content_type in ("application/x-ndjson", "application/jsonl"):
+        rows = importer.iter_ndjson_rows(file.file)
+    else:
+        rows = importer.iter_csv_rows(file.file)
+    return importer.import_employees(db, rows)
+
+def _conditional_response(request: Request, cached: CachedResponse) -> Response:
+    """Serve cached JSON bytes, or 304 when the client already holds this ETag."""
+    headers = {"Cache-Control": "no-cache"}
+    if cached.etag is not None:
+        headers["ETag"] = cached.etag
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
 @app.get("/employees/{employee_id}", response_model=schemas.EmployeeOut)
-def get_employee(employee_id: int, db:Session = Depends(get_db), current_user = Depends(auth.get_current_user)):
+async def get_employee(employee_id: int, request: Request, current_user = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
     if current_user.role == Role.employee and current_user.id != employee_id:
         raise HTTPException(status_code=403, detail="You can only view your own details")
-    
-    emp = crud.get_employee(db, employee_id)
-    if not emp:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    return emp
+
+    # A cache hit (and so a 304) never touches the session. Misses are read from the
+    # primary: a lagging replica's body would be cached under the post-write version
+    cached = response_cache.get("employee", employee_id)
+    if cached is None:
+        version = response_cache.version(employee_id)
+        emp = await crud_async.get_employee(db, employee_id)
+        if not emp:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        body = schemas.EmployeeOut.model_validate(emp).model_dump_json().encode()
+        cached = response_cache.put("employee", employee_id, body, version)
+    return _conditional_response(request, cached)
 
 @app.get("/employees", response_model=List[schemas.EmployeeOut])
-def list_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user = Depends(auth.require_role([Role.manager]))):
-    return crud.list_employees(db, skip, limit)
+async def list_employees(response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = None, current_user = Depends(auth.require_role([Role.manager])), db: AsyncSession = Depends(get_read_db)):
+    after_id = _decode_cursor(after, skip)
+    employees = await crud_async.list_employees(db, skip, limit, after_id=after_id)
+    _set_next_cursor(response, employees, limit)
+    return employees
 
 @app.get("/employees/{employee_id}/balance", response_model=schemas.BalanceOut)
-def get_balance(employee_id: int, db:Session = Depends(get_db), current_user = Depends(auth.get_current_user)):
+async def get_balance(employee_id: int, request: Request, current_user = Depends(auth.get_token_principal), db: AsyncSession = Depends(get_async_db)):
     if current_user.role == Role.employee and current_user.id != employee_id:
         raise HTTPException(status_code=403, detail="You can only view your own balance")
-    
-    emp = crud.get_employee(db, employee_id)
+
+    # Filled from the primary for the same reason as get_employee
+    cached = response_cache.get("balance", employee_id)
+    if cached is None:
+        version = response_cache.version(employee_id)
+        balance = await crud_async.get_balance(db, employee_id, date.today().year)
+        if balance is None:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        body = schemas.BalanceOut(**balance._mapping).model_dump_json().encode()
+        cached = response_cache.put("balance", employee_id, body, version)
+    return _conditional_response(request, cached)
+
+@app.patch("/employees/{employee_id}", response_model=schemas.EmployeeOut)
+async def update_employee(employee_id: int, payload: schemas.EmployeeUpdate, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    emp = await crud_async.get_employee(db, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return schemas.BalanceOut(employee_id=emp.id, leave_balance=emp.leave_balance)
+    return await crud_async.update_employee(db, emp, role=payload.role, is_active=payload.is_active)
+
+@app.get("/admin/cache-stats")
+async def cache_stats(current_user = Depends(auth.require_role([Role.manager]))):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "token_cache": auth.token_cache.stats(),
+    }
+
+@app.get("/admin/pool-stats")
+async def pool_stats(current_user = Depends(auth.require_role([Role.manager]))):
+    return {name: metrics.stats() for name, metrics in pool_metrics.items()}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    # Unauthenticated like most scrape targets; it exposes route templates and timings only
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/sweeper-stats")
+async def sweeper_stats(current_user = Depends(auth.require_role([Role.manager]))):
+    return {"refresh_tokens": refresh_token_sweeper.stats()}
 
 
 @app.post("/leave/apply", response_model=schemas.LeaveOut, status_code=status.HTTP_201_CREATED)
-def apply_leave(payload: schemas.LeaveApply, db:Session = Depends(get_db), current_user = Depends(auth.require_role([Role.employee]))):
+async def apply_leave(payload: schemas.LeaveApply, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.employee]))):
     if payload.employee_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only apply leave for yourself")
     
-    emp = crud.get_employee(db, payload.employee_id)
+    emp = await crud_async.get_employee(db, payload.employee_id)
     
     try:
-        leave = crud.apply_leave(db, employee=emp, start_date=payload.start_date, end_date=payload.end_date,)
+        leave = await crud_async.apply_leave(db, employee=emp, start_date=payload.start_date, end_date=payload.end_date,)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     return leave
 
 @app.put("/leave/{leave_id}/approve")
-def approve_leave(leave_id: int, db: Session = Depends(get_db), current_user = Depends(auth.require_role([Role.manager]))):
-    leave = crud.get_leave(db, leave_id)
+async def approve_leave(leave_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    leave = await crud_async.get_leave(db, leave_id)
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
     
-    emp = crud.get_employee(db, employee_id=leave.employee_id)
+    employee_id = leave.employee_id
     try:
-        leave, updated_balance = crud.approve_leave(db, leave=leave, employee=emp)
+        updated_balance = await crud_async.approve_leave(db, leave=leave)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "id": leave.id,
-        "employee_id": emp.id,
-        "status": leave.status,
+        "id": leave_id,
+        "employee_id": employee_id,
+        "status": LeaveStatus.approved,
         "updated_leave_balance": updated_balance
     }
 
+@app.post("/leave/bulk-decision", response_model=List[schemas.BulkDecisionItemOut])
+async def bulk_decide_leaves(payload: schemas.BulkDecisionRequest, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    decisions = [(item.leave_id, item.decision == schemas.Decision.approve) for item in payload.items]
+    return await crud_async.bulk_decide_leaves(db, decisions)
+
 @app.put("/leave/{leave_id}/reject", response_model=schemas.LeaveOut)
-def reject_leave(leave_id: int, db: Session = Depends(get_db), current_user = Depends(auth.require_role([Role.manager]))):
-    leave = crud.get_leave(db, leave_id)
+async def reject_leave(leave_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    leave = await crud_async.get_leave(db, leave_id)
     if not leave:
         raise HTTPException(status_code=404, detail="Leave request not found")
     try:
-        leave = crud.reject_leave(db, leave=leave)
+        leave = await crud_async.reject_leave(db, leave=leave)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     return leave
 
 @app.get("/leave/employee/{employee_id}", response_model=List[schemas.LeaveOut])
-def list_employee_leaves(employee_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user = Depends(auth.get_current_user)):
+async def list_employee_leaves(employee_id: int, response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = None, current_user = Depends(auth.get_token_principal), db: AsyncSession = Depends(get_read_db)):
     if current_user.role == Role.employee and current_user.id != employee_id:
         raise HTTPException(status_code=403, detail="You can only view your own leave records")
     
-    emp = crud.get_employee(db, employee_id)
+    emp = await crud_async.get_employee(db, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return crud.list_leaves_for_employee(db, employee_id, skip=skip, limit=limit)
+    after_id = _decode_cursor(after, skip)
+    leaves = await crud_async.list_leaves_for_employee(db, employee_id, skip=skip, limit=limit, after_id=after_id)
+    _set_next_cursor(response, leaves, limit)
+    return leaves
+
+
+@app.get("/analytics/leave-summary", response_model=schemas.LeaveSummaryOut)
+async def leave_summary(
+    year: Optional[int] = Query(None, ge=1900, le=2999),
+    department: Optional[str] = None,
+    current_user = Depends(auth.require_role([Role.manager])),
+    db: AsyncSession = Depends(get_read_db),
+):
+    year = year or date.today().year
+    summary = summary_cache.get(year, department)
+    if summary is None:
+        generation = summary_cache.generation
+        summary = await crud_async.leave_summary(db, year, department)
+        summary_cache.put(year, department, summary, generation)
+    return summary
+
+@app.get("/holidays", response_model=List[schemas.HolidayOut])
+async def list_holidays(region: Optional[str] = None, year: Optional[int] = None, current_user = Depends(auth.get_current_user), db: AsyncSession = Depends(get_read_db)):
+    return await crud_async.list_holidays(db, region or settings.HOLIDAY_REGION, year)
+
+@app.post("/holidays", response_model=schemas.HolidayOut, status_code=status.HTTP_201_CREATED)
+async def create_holiday(payload: schemas.HolidayCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    try:
+        return await crud_async.create_holiday(db, region=payload.region, day=payload.date, name=payload.name)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Holiday already exists")
+
+@app.delete("/holidays/{holiday_id}")
+async def delete_holiday(holiday_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(auth.require_role([Role.manager]))):
+    holiday = await crud_async.get_holiday(db, holiday_id)
+    if not holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    await crud_async.delete_holiday(db, holiday)
+    return {"message": "Holiday deleted"}
+
+@app.get("/departments/{department}/calendar", response_model=List[schemas.CalendarEntryOut])
+async def department_calendar(
+    department: str,
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+    current_user = Depends(auth.require_role([Role.manager])),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+
+    entries = leave_calendar.query(department, date_from, date_to)
+    if entries is None:
+        # Loaded from the primary: the index is then kept current by this process's writes
+        leave_calendar.begin_load(department)
+        try:
+            rows = await crud_async.department_calendar_rows(db, department)
+            # Sorting a large department is CPU work; keep it off the event loop
+            await run_in_threadpool(leave_calendar.load, department, rows)
+        except Exception:
+            leave_calendar.abandon_load(department)
+            raise
+        entries = leave_calendar.query(department, date_from, date_to)
+    return entries
+
+@app.get("/export/employees.ndjson")
+async def export_employees(
+    department: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    current_user = Depends(auth.require_role([Role.manager])),
+    session_factory = Depends(get_read_sessionmaker),
+):
+    stmt = crud.employee_export_query(department=department, joined_from=date_from, joined_to=date_to)
+    return StreamingResponse(export.stream_ndjson(session_factory, stmt), media_type="application/x-ndjson")
+
+@app.get("/export/leaves.ndjson")
+async def export_leaves(
+    department: Optional[str] = None,
+    leave_status: Optional[LeaveStatus] = Query(None, alias="status"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    current_user = Depends(auth.require_role([Role.manager])),
+    session_factory = Depends(get_read_sessionmaker),
+):
+    stmt = crud.leave_export_query(department=department, status=leave_status, date_from=date_from, date_to=date_to)
+    return StreamingResponse(export.stream_ndjson(session_factory, stmt), media_type="application/x-ndjson")
@@ -0,0 +1,210 @@
+"""
+In-process request metrics, exposed at /metrics in Prometheus text format.
+
+Counters are sharded per thread: each thread only ever adds to its own list,
+so recording takes no lock and loses no updates; a scrape sums the shards.
+Per-request SQL counts come from Engine-level cursor hooks, which see the
+request through a context variable (SQLAlchemy's async greenlets inherit it).
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import get_ident
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class _Shards:
+    """One list of `size` floats per thread; sum() adds them up."""
+
+    __slots__ = ("size", "_by_thread")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._by_thread: Dict[int, List[float]] = {}
+
+    def local(self) -> List[float]:
+        shard = self._by_thread.get(get_ident())
+        if shard is None:
+            # setdefault is atomic, so a thread's first two writes cannot race
+            shard = self._by_thread.setdefault(get_ident(), [0.0] * self.size)
+        return shard
+
+    def sum(self) -> List[float]:
+        totals = [0.0] * self.size
+        for shard in list(self._by_thread.values()):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], _Shards] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        series = self._series.get(labels) or self._series.setdefault(labels, _Shards(1))
+        series.local()[0] += amount
+
+    def value(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series.sum()[0] if series is not None else 0.0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, series in sorted(self._series.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(series.sum()[0])}")
+        return lines
+
+    def clear(self) -> None:
+        self._series = {}
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], _Shards] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # one slot per bucket plus +Inf, then sum and count
+            series = self._series.setdefault(labels, _Shards(len(self.buckets) + 3))
+        shard = series.local()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series.sum()[-1]) if series is not None else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            totals = series.sum()
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (float("inf"),), totals):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(totals[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_number(totals[-1])}")
+        return lines
+
+    def clear(self) -> None:
+        self._series = {}
+
+
+http_requests = Counter("lms_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = Histogram("lms_http_request_duration_seconds", "Time to fully send the response.", ("method", "route"))
+request_statements = Histogram(
+    "lms_http_request_db_statements", "SQL statements issued per request.", ("method", "route"), buckets=STATEMENT_BUCKETS
+)
+request_db_time = Histogram("lms_http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route"))
+db_statements = Counter("lms_db_statements_total", "SQL statements executed, including background work.")
+db_time = Counter("lms_db_seconds_total", "Time spent executing SQL, including background work.")
+password_verify = Histogram("lms_password_verify_seconds", "auth.verify_password calls, including hashing-pool queueing.")
+
+REGISTRY = (http_requests, http_latency, request_statements, request_db_time, db_statements, db_time, password_verify)
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def clear() -> None:
+    for metric in REGISTRY:
+        metric.clear()
+
+
+# ---------- SQL hooks ----------
+@dataclass(slots=True)
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["lms_query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("lms_query_started", time.perf_counter())
+    db_statements.inc()
+    db_time.inc(amount=elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+# ---------- ASGI middleware ----------
+class MetricsMiddleware:
+    """
+    Times every HTTP request through the last body chunk, labelled by route template.
+    `on_complete(method, route, statements)` runs after recording, e.g. query_budget.enforce.
+    """
+
+    def __init__(self, app, on_complete: Optional[Callable[[str, str, int], None]] = None):
+        self.app = app
+        self.on_complete = on_complete
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            route = scope.get("route")
+            # The template (/employees/{employee_id}), never the raw path, keeps label cardinality bounded
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            http_requests.inc(*labels, str(status_code))
+            http_latency.observe(elapsed, *labels)
+            request_statements.observe(stats.statements, *labels)
+            request_db_time.observe(stats.db_seconds, *labels)
+        if self.on_complete is not None and route is not None:
+            self.on_complete(scope["method"], route.path, stats.statements)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Date, ForeignKey, CheckConstraint, Enum as SAEnum, Boolean, DateTime, func
+from sqlalchemy import Integer, String, Date, ForeignKey, CheckConstraint, Index, UniqueConstraint, Enum as SAEnum, Boolean, DateTime, Float, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .database import Base
 import enum
@@ -27,6 +27,8 @@ class Employee(Base):
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[Role] = mapped_column(SAEnum(Role), nullable=False, default=Role.employee)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Epoch seconds; access tokens issued (iat) up to then are refused in every process
+    tokens_revoked_at: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     # Relationship: One employee can have many leave requests
     leaves: Mapped[list["LeaveRequest"]] = relationship("LeaveRequest", back_populates="employee", cascade="all, delete-orphan")
@@ -50,6 +52,11 @@ class LeaveRequest(Base):
     # adding constraint 
     __table_args__ = (
         CheckConstraint("num_days > 0", name="ck_num_days_positive"),
+        # Serves has_overlapping_leave: seek on employee + status, then end_date >= start
+        # so only leaves ending after the requested start are visited, not the whole history
+        Index("ix_leave_requests_overlap", "employee_id", "status", "end_date", "start_date"),
+        # Covers leave_summary: a month's leaves are one start_date range read from the index alone
+        Index("ix_leave_requests_period", "start_date", "end_date", "status", "employee_id", "num_days"),
         )
 
 
@@ -59,8 +66,40 @@ class RefreshToken(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
 
     token_hash: Mapped[str] = mapped_column(String(255), nullable=False, unique=True, index=True)
+    # Session the token belongs to: set at login and carried through every rotation
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # Set when the token is rotated away; presenting it again means it leaked
+    used_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # indexed for the expiry sweeper's range scan
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
 
-    user: Mapped["Employee"] = relationship("Employee", back_populates="refresh_tokens")
\ No newline at end of file
+    user: Mapped["Employee"] = relationship("Employee", back_populates="refresh_tokens")
+
+
+class Holiday(Base):
+    __tablename__ = "holidays"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    region: Mapped[str] = mapped_column(String(50), nullable=False)
+    date: Mapped["date"] = mapped_column(Date, nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # One holiday per region and day; also serves the per-year range lookup
+    __table_args__ = (
+        UniqueConstraint("region", "date", name="uq_holidays_region_date"),
+        )
+
+
+class EmployeeLeaveSummary(Base):
+    """
+    Per-employee, per-year leave totals kept in step with leave_requests by crud.
+    A leave counts toward the year it starts in. Rebuild with python -m app.leave_summaries.
+    """
+    __tablename__ = "employee_leave_summary"
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pending_requests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_days: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    approved_requests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    approved_days: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,27 @@
+import base64
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque keyset cursor pointing just past the row with this id."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the id encoded by encode_cursor; raises ValueError if tampered with."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def next_cursor(rows, limit: int):
+    """Cursor for the page after rows, or None when this was the last page."""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1].id)
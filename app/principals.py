@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from .config import settings
+from .models import Role
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated caller, detached from any DB session."""
+    id: int
+    email: str
+    role: Role
+    is_active: bool
+
+
+class RevocationList:
+    """
+    Tracks employees whose already-issued access tokens must be refused.
+
+    The source of truth is the employees table (is_active, tokens_revoked_at),
+    re-read at most once per REVOCATION_REFRESH_SECONDS, so a revocation made
+    by any worker reaches every process within that interval; revoke() also
+    takes effect immediately in the process that made it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inactive: FrozenSet[int] = frozenset()
+        self._revoked_at: Dict[int, float] = {}
+        self._loaded_at = 0.0
+
+    def revoke(self, employee_id: int) -> None:
+        """Refuse every token issued to this employee up to now."""
+        with self._lock:
+            self._revoked_at[employee_id] = time.time()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._inactive = frozenset()
+            self._revoked_at.clear()
+            self._loaded_at = 0.0
+
+    def needs_refresh(self) -> bool:
+        return time.time() - self._loaded_at >= settings.REVOCATION_REFRESH_SECONDS
+
+    @staticmethod
+    def horizon() -> float:
+        # Tokens older than the access-token lifetime have expired on their own
+        return time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    def load(self, rows) -> None:
+        """Replace the state with crud.list_token_revocations rows read since horizon()."""
+        now = time.time()
+        horizon = self.horizon()
+        with self._lock:
+            self._inactive = frozenset(employee_id for employee_id, is_active, _ in rows if not is_active)
+            revoked_at = {k: v for k, v in self._revoked_at.items() if v >= horizon}
+            for employee_id, _, at in rows:
+                if at is not None and at >= horizon:
+                    revoked_at[employee_id] = max(at, revoked_at.get(employee_id, at))
+            self._revoked_at = revoked_at
+            self._loaded_at = now
+
+    def is_revoked(self, employee_id: int, issued_at: float) -> bool:
+        if employee_id in self._inactive:
+            return True
+        revoked_at = self._revoked_at.get(employee_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+
+class PrincipalCache:
+    """Bounded LRU of principals keyed by token subject, each entry expiring after a TTL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def ttl() -> float:
+        # Never outlive the access token that authenticated the entry
+        return min(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 - 1)
+
+    def get(self, sub: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(sub)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[sub]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sub)
+            self.hits += 1
+            return principal
+
+    def put(self, sub: str, principal: Principal) -> None:
+        ttl = self.ttl()
+        if ttl <= 0 or settings.PRINCIPAL_CACHE_SIZE <= 0:
+            return
+        with self._lock:
+            self._entries[sub] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(sub)
+            while len(self._entries) > settings.PRINCIPAL_CACHE_SIZE:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, sub: str) -> None:
+        with self._lock:
+            self._entries.pop(sub, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": settings.PRINCIPAL_CACHE_SIZE,
+                "ttl_seconds": self.ttl(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def invalidate_employee(employee_id: int, email: str) -> None:
+    """Drop cached state for an employee whose role or active flag changed."""
+    principal_cache.invalidate(email)
+    revocations.revoke(employee_id)
+
+
+revocations = RevocationList()
+principal_cache = PrincipalCache()
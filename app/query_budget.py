@@ -0,0 +1,98 @@
+"""
+Per-route SQL statement budgets.
+
+MetricsMiddleware counts the statements each request issues and calls
+enforce() once the response is sent. QUERY_BUDGET_MODE decides what an
+overrun does: "log" (a warning, the default), "raise" (the test suite, so a
+new N+1 fails the test that hit it) or "off".
+
+Budgets are the most statements a route may issue on its worst path in the
+test suite, counting the auth lookup (principal cache miss) and any
+read-through cache miss. Raise one deliberately, in the same change that
+adds the query.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from .config import settings
+from .metrics import RequestStats, current_request
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+ROUTE_BUDGETS: Dict[Tuple[str, str], int] = {
+    # auth
+    ("POST", "/auth/register"): 3,
+    ("POST", "/auth/token"): 3,
+    ("POST", "/auth/refresh"): 2,
+    ("POST", "/auth/logout"): 2,
+    # employees
+    ("POST", "/employees"): 4,
+    ("POST", "/employees/import"): 7,  # per import batch
+    ("GET", "/employees/{employee_id}"): 2,
+    ("GET", "/employees"): 2,
+    ("GET", "/employees/{employee_id}/balance"): 2,
+    ("PATCH", "/employees/{employee_id}"): 4,
+    # admin
+    ("GET", "/admin/cache-stats"): 1,
+    ("GET", "/admin/pool-stats"): 1,
+    ("GET", "/admin/sweeper-stats"): 1,
+    ("GET", "/metrics"): 0,
+    # leaves
+    ("POST", "/leave/apply"): 10,
+    ("PUT", "/leave/{leave_id}/approve"): 5,
+    ("POST", "/leave/bulk-decision"): 7,
+    ("PUT", "/leave/{leave_id}/reject"): 5,
+    ("GET", "/leave/employee/{employee_id}"): 3,
+    ("GET", "/analytics/leave-summary"): 5,
+    ("GET", "/departments/{department}/calendar"): 2,
+    # holidays
+    ("GET", "/holidays"): 2,
+    ("POST", "/holidays"): 3,
+    ("DELETE", "/holidays/{holiday_id}"): 2,
+    # exports stream in EXPORT_BATCH_SIZE pages; budgets cover one page
+    ("GET", "/export/employees.ndjson"): 2,
+    ("GET", "/export/leaves.ndjson"): 2,
+}
+
+
+def budget_for(method: str, route: str) -> Optional[int]:
+    return ROUTE_BUDGETS.get((method, route))
+
+
+def enforce(method: str, route: str, statements: int) -> None:
+    mode = settings.QUERY_BUDGET_MODE
+    if mode == "off":
+        return
+    budget = ROUTE_BUDGETS.get((method, route))
+    if budget is None or statements <= budget:
+        return
+    message = f"{method} {route} issued {statements} SQL statements (budget {budget})"
+    if mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(limit: int, label: str = "block") -> Iterator[RequestStats]:
+    """Count the statements run inside the block (any engine) and enforce `limit` like a route budget."""
+    outer = current_request.get()
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request.reset(token)
+        if outer is not None:
+            outer.statements += stats.statements
+            outer.db_seconds += stats.db_seconds
+    if stats.statements > limit:
+        message = f"{label} issued {stats.statements} SQL statements (budget {limit})"
+        if settings.QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
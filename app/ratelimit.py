@@ -0,0 +1,251 @@
+"""
+Rate-limit storages for slowapi / limits.
+
+Both keep one row per key: the current window index, its count and the
+previous window's count, which is all the sliding-window-counter strategy
+needs. Windows are aligned to multiples of the limit's expiry, so a fixed
+window reads the same row.
+
+    lru-memory://                  this process only; idle keys evicted LRU
+    sqlite:////dev/shm/lms-rl.db   shared by every worker on the host
+
+Importing this module registers both schemes with limits.storage_from_string.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from math import floor
+from typing import List, Tuple
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+DEFAULT_MAX_KEYS = 100_000
+
+
+def _window(now: float, expiry: int) -> Tuple[int, float]:
+    """Index of the window containing `now`, and the weight left on the previous one."""
+    position = now / expiry
+    return int(position), 1 - position % 1
+
+
+def _roll(entry: List, window: int) -> Tuple[int, int]:
+    """(previous, current) counts of `entry` as seen from `window`."""
+    entry_window, current, previous = entry[0], entry[1], entry[2]
+    if entry_window == window:
+        return previous, current
+    if entry_window == window - 1:
+        return current, 0
+    return 0, 0
+
+
+class LRUMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """In-process counters bounded to `max_keys`; the least recently hit key is dropped first."""
+
+    STORAGE_SCHEME = ["lru-memory"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, max_keys: int = DEFAULT_MAX_KEYS, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.max_keys = int(max_keys)
+        self._lock = threading.Lock()
+        # key -> [window, current, previous, expiry]
+        self._entries: "OrderedDict[str, List]" = OrderedDict()
+
+    @property
+    def base_exceptions(self):
+        return ValueError
+
+    def _touch(self, key: str, window: int, expiry: int) -> List:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [window, 0, 0, expiry]
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+            entry[2], entry[1] = _roll(entry, window)
+            entry[0] = window
+        return entry
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        window, _ = _window(time.time(), expiry)
+        with self._lock:
+            entry = self._touch(key, window, expiry)
+            entry[1] += amount
+            return entry[1]
+
+    def get(self, key: str) -> int:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0
+        return _roll(entry, _window(time.time(), entry[3])[0])[1]
+
+    def get_expiry(self, key: str) -> float:
+        entry = self._entries.get(key)
+        return time.time() if entry is None else (entry[0] + 1) * entry[3]
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        window, weight = _window(time.time(), expiry)
+        with self._lock:
+            entry = self._touch(key, window, expiry)
+            if floor(entry[2] * weight + entry[1]) + amount > limit:
+                return False
+            entry[1] += amount
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        window, weight = _window(now, expiry)
+        entry = self._entries.get(key)
+        previous, current = _roll(entry, window) if entry is not None else (0, 0)
+        return previous, (weight * expiry if previous else 0.0), current, weight * expiry + expiry
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+
+# Window roll-over expressed over the existing row, for the upsert below
+_PREVIOUS = "CASE WHEN win = :win THEN prev WHEN win = :win - 1 THEN cur ELSE 0 END"
+_CURRENT = "CASE WHEN win = :win THEN cur ELSE 0 END"
+
+_UPSERT = f"""
+INSERT INTO rate_limits (key, win, cur, prev, expiry, touched) VALUES (:key, :win, :amount, 0, :expiry, :now)
+ON CONFLICT (key) DO UPDATE SET prev = {_PREVIOUS}, cur = {_CURRENT} + :amount, win = :win, expiry = :expiry, touched = :now
+"""
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Counters in a SQLite file shared by all worker processes on one host.
+
+    Every hit is a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so
+    checking and counting is atomic across processes without an explicit
+    transaction. Durability is traded away (synchronous=OFF): after a crash
+    the worst case is forgetting recent hits. Put the file on tmpfs
+    (/dev/shm) to keep it off disk entirely. Every `evict_every` writes,
+    keys idle for two windows are dropped and the table is trimmed to
+    `max_keys` least-recently-hit first.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, max_keys: int = DEFAULT_MAX_KEYS, evict_every: int = 1024, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # SQLAlchemy-style: sqlite:///relative.db, sqlite:////absolute.db
+        self.path = uri.removeprefix("sqlite:///")
+        self.max_keys = int(max_keys)
+        self.evict_every = int(evict_every)
+        self._local = threading.local()
+        self._writes = 0
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A forked worker must not share its parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS rate_limits ("
+                        " key TEXT PRIMARY KEY, win INTEGER NOT NULL, cur INTEGER NOT NULL,"
+                        " prev INTEGER NOT NULL, expiry INTEGER NOT NULL, touched REAL NOT NULL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_touched ON rate_limits (touched)")
+                    self._initialized = True
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _wrote(self, conn: sqlite3.Connection, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.evict_every:
+            return
+        conn.execute("DELETE FROM rate_limits WHERE touched < :now - 2 * expiry", {"now": now})
+        conn.execute(
+            "DELETE FROM rate_limits WHERE key IN (SELECT key FROM rate_limits ORDER BY touched"
+            " LIMIT max(0, (SELECT count(*) FROM rate_limits) - :max_keys))",
+            {"max_keys": self.max_keys},
+        )
+
+    def _row(self, key: str):
+        return self._connection().execute("SELECT win, cur, prev, expiry FROM rate_limits WHERE key = ?", (key,)).fetchone()
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connection()
+        params = {"key": key, "win": _window(now, expiry)[0], "amount": amount, "expiry": expiry, "now": now}
+        count = conn.execute(_UPSERT + " RETURNING cur", params).fetchone()[0]
+        self._wrote(conn, now)
+        return count
+
+    def get(self, key: str) -> int:
+        row = self._row(key)
+        if row is None:
+            return 0
+        return _roll(row, _window(time.time(), row[3])[0])[1]
+
+    def get_expiry(self, key: str) -> float:
+        row = self._row(key)
+        return time.time() if row is None else (row[0] + 1) * row[3]
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        window, weight = _window(now, expiry)
+        conn = self._connection()
+        # The WHERE on DO UPDATE refuses the hit without touching the row
+        acquired = conn.execute(
+            _UPSERT + f" WHERE CAST(({_PREVIOUS}) * :weight + {_CURRENT} AS INTEGER) + :amount <= :limit RETURNING cur",
+            {"key": key, "win": window, "amount": amount, "expiry": expiry, "now": now, "weight": weight, "limit": limit},
+        ).fetchone()
+        if acquired is None:
+            # A refused key is still in use; keep it from being evicted (and reset) as idle
+            conn.execute("UPDATE rate_limits SET touched = ? WHERE key = ?", (now, key))
+        self._wrote(conn, now)
+        return acquired is not None
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        window, weight = _window(time.time(), expiry)
+        row = self._row(key)
+        previous, current = _roll(row, window) if row is not None else (0, 0)
+        return previous, (weight * expiry if previous else 0.0), current, weight * expiry + expiry
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
@@ -0,0 +1,108 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    # None when the body was read across a change and must not be revalidated
+    etag: Optional[str]
+    body: bytes
+
+
+class ResponseCache:
+    """
+    Serialized JSON for per-employee reads (employee record, balance), with ETags.
+
+    Each employee has a version counter that crud bumps after committing any
+    change to the employee or their leaves; the ETag is derived from it, so a
+    conditional GET can be answered from memory. Entries expire after
+    RESPONSE_CACHE_TTL_SECONDS so changes committed by other processes are
+    picked up; if the re-read body differs, the version is bumped there too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, int, CachedResponse]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        # ETags from another process (or before clear()) never match ours
+        self._epoch = secrets.token_hex(4)
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, employee_id: int) -> int:
+        return self._versions.get(employee_id, 0)
+
+    def bump(self, *employee_ids: int) -> None:
+        with self._lock:
+            for employee_id in employee_ids:
+                self._versions[employee_id] = self._versions.get(employee_id, 0) + 1
+
+    def get(self, kind: str, employee_id: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get((kind, employee_id))
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != self._versions.get(employee_id, 0):
+                self.misses += 1
+                return None
+            self._entries.move_to_end((kind, employee_id))
+            self.hits += 1
+            return entry[2]
+
+    def put(self, kind: str, employee_id: int, body: bytes, version: int) -> CachedResponse:
+        """
+        Store a body read at `version` and return it with its ETag. If the
+        employee changed while it was being read nothing is stored and the ETag is None.
+        """
+        key = (kind, employee_id)
+        with self._lock:
+            current = self._versions.get(employee_id, 0)
+            if version != current:
+                return CachedResponse(None, body)
+            previous = self._entries.get(key)
+            if previous is not None and previous[1] == current and previous[2].body != body:
+                # Changed behind our back (another process); clients holding the old tag must miss
+                current += 1
+                self._versions[employee_id] = current
+            response = CachedResponse(f'"{kind[0]}{employee_id}-{self._epoch}-{current}"', body)
+            if settings.RESPONSE_CACHE_SIZE > 0 and settings.RESPONSE_CACHE_TTL_SECONDS > 0:
+                self._entries[key] = (time.monotonic() + settings.RESPONSE_CACHE_TTL_SECONDS, current, response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > settings.RESPONSE_CACHE_SIZE:
+                    self._entries.popitem(last=False)
+            return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._epoch = secrets.token_hex(4)
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": settings.RESPONSE_CACHE_SIZE,
+                "ttl_seconds": settings.RESPONSE_CACHE_TTL_SECONDS,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110): any listed tag or '*' matches."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+response_cache = ResponseCache()
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, EmailStr, field_validator, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
 from datetime import date
+from typing import List, Optional
 from enum import Enum
 from app.models import Role, LeaveStatus
-from app.auth import validate_password_strength
+from app.password_policy import validate_password_strength
+from app.config import settings
 
 
 # ------------ AUTH ------------
@@ -60,6 +62,21 @@ class EmployeeOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)   # allows conversion from SQLAlchemy model
 
+# Request: manager changing an employee's role or active flag
+class EmployeeUpdate(BaseModel):
+    role: Optional[Role] = None
+    is_active: Optional[bool] = None
+
+# Response: outcome of a bulk employee import
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class ImportReport(BaseModel):
+    created: int
+    errors: List[ImportRowError]
+
 # ---------- LEAVE ----------
 
 # Request: when applying for leave
@@ -79,7 +96,85 @@ class LeaveOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-# Response: only leave balance
+# Response: one leave on a department calendar
+class CalendarEntryOut(BaseModel):
+    leave_id: int
+    employee_id: int
+    employee_name: str
+    start_date: date
+    end_date: date
+    status: LeaveStatus
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Response: leave balance plus this year's totals from employee_leave_summary
 class BalanceOut(BaseModel):
     employee_id: int
-    leave_balance: int
\ No newline at end of file
+    leave_balance: int
+    pending_requests: int = 0
+    pending_days: int = 0
+    approved_days_ytd: int = 0
+
+# Request: manager approving/rejecting many leaves at once
+class Decision(str, Enum):
+    approve = "approve"
+    reject = "reject"
+
+class LeaveDecisionItem(BaseModel):
+    leave_id: int
+    decision: Decision
+
+class BulkDecisionRequest(BaseModel):
+    items: List[LeaveDecisionItem] = Field(min_length=1, max_length=5000)
+
+# Response: outcome of each item of a bulk decision
+class DecisionResult(str, Enum):
+    ok = "ok"
+    not_found = "not_found"
+    already_approved = "already_approved"
+    already_rejected = "already_rejected"
+    insufficient_balance = "insufficient_balance"
+    skipped = "skipped"  # lost a race with a concurrent decision
+
+class BulkDecisionItemOut(BaseModel):
+    leave_id: int
+    result: DecisionResult
+    status: Optional[LeaveStatus] = None
+    employee_id: Optional[int] = None
+    updated_leave_balance: Optional[int] = None
+
+# Response: leave analytics
+class MonthSummary(BaseModel):
+    month: int
+    approved_days: int
+    pending_days: int
+    pending_requests: int
+    utilization: float
+
+class DepartmentSummary(BaseModel):
+    department: str
+    employees: int
+    average_balance: Optional[float]
+    approved_days: int
+    pending_days: int
+    pending_requests: int
+    months: List[MonthSummary]
+
+class LeaveSummaryOut(BaseModel):
+    year: int
+    departments: List[DepartmentSummary]
+
+# Request: manager adds a public holiday
+class HolidayCreate(BaseModel):
+    region: str = Field(default_factory=lambda: settings.HOLIDAY_REGION, min_length=1, max_length=50)
+    date: date
+    name: str = Field(min_length=1, max_length=100)
+
+# Response: holiday
+class HolidayOut(BaseModel):
+    id: int
+    region: str
+    date: date
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from . import crud_async
+from .config import settings
+from .database import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenSweeper:
+    """
+    Periodically purges expired refresh tokens in chunks of
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE, one short transaction per chunk so the
+    table is never locked for the whole purge.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.total_purged = 0
+        self.last_purged = 0
+        self.last_batches = 0
+        self.last_duration_seconds = 0.0
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    async def run_once(self) -> int:
+        """Delete every token expired as of now; returns the rows removed."""
+        now = datetime.utcnow()
+        batch_size = settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE
+        started = time.perf_counter()
+        purged = batches = 0
+        async with self.session_factory() as db:
+            while True:
+                deleted = await crud_async.delete_expired_refresh_tokens_batch(db, now, batch_size)
+                purged += deleted
+                batches += 1
+                if deleted < batch_size:
+                    break
+                # let request handlers in between chunks
+                await asyncio.sleep(0)
+
+        self.runs += 1
+        self.total_purged += purged
+        self.last_purged = purged
+        self.last_batches = batches
+        self.last_duration_seconds = time.perf_counter() - started
+        self.last_run_at = now
+        self.last_error = None
+        return purged
+
+    async def _loop(self):
+        while True:
+            try:
+                purged = await self.run_once()
+                if purged:
+                    logger.info("Purged %d expired refresh tokens", purged)
+            except Exception as e:
+                self.last_error = repr(e)
+                logger.exception("Refresh token sweep failed")
+            await asyncio.sleep(settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS <= 0 or self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "total_purged": self.total_purged,
+            "last_purged": self.last_purged,
+            "last_batches": self.last_batches,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+refresh_token_sweeper = RefreshTokenSweeper()
@@ -0,0 +1,75 @@
+import calendar
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+from .config import settings
+
+
+HolidayLoader = Callable[[str, int], Iterable[date]]
+
+
+def _build_year(year: int, weekend: Tuple[int, ...], holidays: Set[date]) -> array:
+    """cum[i] = working days among the first i days of the year (cum[0] == 0)."""
+    days = 366 if calendar.isleap(year) else 365
+    cum = array("H", bytes(2 * (days + 1)))
+    day = date(year, 1, 1)
+    running = 0
+    for i in range(days):
+        if day.weekday() not in weekend and day not in holidays:
+            running += 1
+        cum[i + 1] = running
+        day += timedelta(days=1)
+    return cum
+
+
+class BusinessCalendar:
+    """
+    Working-day counts from per-(region, year) prefix sums.
+
+    Each year is built once from WEEKEND_DAYS and the region's holidays;
+    a range then costs two lookups per calendar year it spans. Years are
+    rebuilt when invalidated (holiday added/removed) or after
+    BUSINESS_CALENDAR_TTL_SECONDS, which picks up changes made by other processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._years: Dict[Tuple[str, int, Tuple[int, ...]], Tuple[float, array]] = {}
+
+    def _year(self, region: str, year: int, load_holidays: HolidayLoader) -> array:
+        weekend = tuple(sorted(settings.WEEKEND_DAYS))
+        key = (region, year, weekend)
+        entry = self._years.get(key)
+        if entry is not None and time.monotonic() - entry[0] < settings.BUSINESS_CALENDAR_TTL_SECONDS:
+            return entry[1]
+        cum = _build_year(year, weekend, set(load_holidays(region, year)))
+        with self._lock:
+            self._years[key] = (time.monotonic(), cum)
+        return cum
+
+    def count(self, start_date: date, end_date: date, region: str, load_holidays: HolidayLoader) -> int:
+        """Working days in [start_date, end_date]; 0 for an empty or inverted range."""
+        total = 0
+        for year in range(start_date.year, end_date.year + 1):
+            first = max(start_date, date(year, 1, 1))
+            last = min(end_date, date(year, 12, 31))
+            if first > last:
+                continue
+            cum = self._year(region, year, load_holidays)
+            total += cum[last.timetuple().tm_yday] - cum[first.timetuple().tm_yday - 1]
+        return total
+
+    def invalidate(self, region: str, year: int) -> None:
+        with self._lock:
+            for key in [k for k in self._years if k[0] == region and k[1] == year]:
+                del self._years[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._years.clear()
+
+
+business_calendar = BusinessCalendar()
@@ -0,0 +1,90 @@
+"""
+GET /analytics/leave-summary computation time over a large leave table.
+
+Seeds --employees employees and --leaves leave rows into a temporary SQLite
+file (about 3% of leaves cross a month boundary), then times crud.leave_summary
+cold and a cache hit.
+
+    python -m benchmarks.bench_analytics
+    python -m benchmarks.bench_analytics --leaves 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.analytics import summary_cache
+from app.database import Base, make_engine
+
+
+def seed(engine, employees: int, leaves: int, departments: int):
+    rng = random.Random(3)
+    with Session(engine) as db:
+        db.execute(insert(models.Employee), [
+            {"name": f"E{i}", "email": f"e{i}@example.com", "department": f"dept-{i % departments}",
+             "joining_date": date(2015, 1, 1), "leave_balance": rng.randrange(30), "password_hash": "x"}
+            for i in range(employees)
+        ])
+        statuses = [models.LeaveStatus.approved] * 6 + [models.LeaveStatus.applied] * 2 + [models.LeaveStatus.rejected]
+        batch = []
+        for i in range(leaves):
+            start = date(2020, 1, 1) + timedelta(days=rng.randrange(6 * 365))
+            length = rng.randrange(3, 30) if rng.random() < 0.03 else 0
+            end = start + timedelta(days=length)
+            batch.append({"employee_id": rng.randrange(1, employees + 1), "start_date": start, "end_date": end,
+                          "num_days": length + 1, "status": rng.choice(statuses)})
+            if len(batch) == 50_000:
+                db.execute(insert(models.LeaveRequest), batch)
+                batch = []
+        if batch:
+            db.execute(insert(models.LeaveRequest), batch)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--leaves", type=int, default=1_000_000)
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="lms-bench-"), "analytics.db")
+    engine = make_engine(f"sqlite:///{path}", name="bench_analytics")
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    seed(engine, args.employees, args.leaves, args.departments)
+    print(f"seeded {args.leaves} leaves in {time.perf_counter() - started:.1f}s")
+    if args.keep:
+        print(path)
+
+    with Session(engine) as db:
+        for label, department in (("all departments", None), ("one department", "dept-7")):
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                crud.leave_summary(db, args.year, department)
+                timings.append(time.perf_counter() - started)
+            print(f"{label:>16}: cold {min(timings) * 1000:7.1f} ms (best of {args.repeat})")
+
+        summary = crud.leave_summary(db, args.year)
+        summary_cache.put(args.year, None, summary, summary_cache.generation)
+        started = time.perf_counter()
+        for _ in range(1000):
+            summary_cache.get(args.year, None)
+        print(f"{'cache hit':>16}: {(time.perf_counter() - started) * 1000:.3f} us")
+    engine.dispose()
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Department calendar query latency: interval index vs per-employee scans.
+
+Generates --employees employees with --leaves leaves each, spread over
+--departments departments, loads them into LeaveCalendar and times
+"who is off between these dates" queries. The baseline mimics what
+managers did before: fetch every team member's leaves and filter them.
+
+    python -m benchmarks.bench_calendar
+    python -m benchmarks.bench_calendar --employees 5000 --queries 500
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from app.leave_calendar import LeaveCalendar
+from app.models import LeaveStatus
+
+
+def generate(employees: int, leaves: int, departments: int, seed: int = 1):
+    rng = random.Random(seed)
+    base = date(2020, 1, 1)
+    rows = defaultdict(list)
+    leave_id = 0
+    for employee_id in range(1, employees + 1):
+        department = f"dept-{employee_id % departments}"
+        for _ in range(leaves):
+            leave_id += 1
+            start = base + timedelta(days=rng.randrange(5 * 365))
+            end = start + timedelta(days=rng.randrange(10))
+            status = LeaveStatus.approved if rng.random() < 0.8 else LeaveStatus.applied
+            rows[department].append((leave_id, employee_id, f"Employee {employee_id}", start, end, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--leaves", type=int, default=20)
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = generate(args.employees, args.leaves, args.departments)
+    total = sum(len(r) for r in rows.values())
+
+    calendar = LeaveCalendar()
+    started = time.perf_counter()
+    for department, department_rows in rows.items():
+        calendar.load(department, department_rows)
+    load_seconds = time.perf_counter() - started
+
+    # Baseline: per-employee leave lists, as returned by /leave/employee/{id}
+    by_employee = defaultdict(lambda: defaultdict(list))
+    for department, department_rows in rows.items():
+        for row in department_rows:
+            by_employee[department][row[1]].append(row)
+
+    rng = random.Random(2)
+    departments = list(rows)
+    probes = []
+    for _ in range(args.queries):
+        lo = date(2020, 1, 1) + timedelta(days=rng.randrange(5 * 365))
+        probes.append((rng.choice(departments), lo, lo + timedelta(days=rng.randrange(1, 15))))
+
+    started = time.perf_counter()
+    found = sum(len(calendar.query(d, lo, hi)) for d, lo, hi in probes)
+    index_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    expected = 0
+    for d, lo, hi in probes:
+        for leaves in by_employee[d].values():
+            expected += sum(1 for r in leaves if r[3] <= hi and r[4] >= lo)
+    scan_seconds = time.perf_counter() - started
+    assert found == expected
+
+    print(f"leaves={total} departments={len(rows)} load={load_seconds:.2f}s")
+    print(f"index: {index_seconds / args.queries * 1e6:9.1f} us/query")
+    print(f"scan:  {scan_seconds / args.queries * 1e6:9.1f} us/query ({found / args.queries:.1f} matches/query)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cold import time of the app's entry points, from python -X importtime.
+
+Each target is imported in a fresh interpreter --runs times; the fastest run
+is reported (cumulative microseconds of the target's own line), along with
+the modules with the largest self time in that run. --output writes JSON in
+the shape benchmarks.compare understands, so import time can be tracked
+against benchmarks/baseline.json like the load and micro suites.
+
+    python -m benchmarks.bench_importtime
+    python -m benchmarks.bench_importtime --targets app.main --top 25
+    python -m benchmarks.bench_importtime --output importtime.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_TARGETS = ["app.config", "app.models", "app.schemas", "app.auth", "app.main"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every import made by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str, runs: int) -> Tuple[int, List[Tuple[str, int, int]]]:
+    best = None
+    for _ in range(runs):
+        rows = import_profile(module)
+        total = next(cumulative for name, _, cumulative in reversed(rows) if name == module)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=DEFAULT_TARGETS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules (self time) listed per target")
+    parser.add_argument("--output", help="also write a JSON report here")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    for module in args.targets:
+        total, rows = measure(module, args.runs)
+        results[module] = {"import_ms": round(total / 1000, 1)}
+        print(f"{module}: {total / 1000:.1f} ms")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"suite": "importtime", "config": {"runs": args.runs}, "results": results}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Login throughput benchmark.
+
+Drives concurrent POST /auth/token requests through the ASGI app in-process
+against a throwaway SQLite database and prints logins/second.
+
+    python -m benchmarks.bench_login --workers 0   # hash on threads (old behaviour)
+    python -m benchmarks.bench_login --workers 4   # hash in a 4-process pool
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, hashing
+from app.config import settings
+from app.database import Base, async_url, get_async_db, get_db, get_read_db
+from app.main import app, limiter
+
+
+EMAIL = "bench@example.com"
+PASSWORD = "Bench!Pass123"
+
+
+async def run(requests: int, concurrency: int, async_engine) -> float:
+    try:
+        return await drive(requests, concurrency)
+    finally:
+        # aiosqlite connection threads would otherwise keep the interpreter alive
+        await async_engine.dispose()
+
+
+async def drive(requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with sem:
+                resp = await client.post("/auth/token", data={"username": EMAIL, "password": PASSWORD})
+                assert resp.status_code == 200, resp.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=settings.HASH_POOL_WORKERS)
+    args = parser.parse_args()
+
+    settings.HASH_POOL_WORKERS = args.workers
+    settings.HASH_POOL_MAX_PENDING = max(settings.HASH_POOL_MAX_PENDING, args.concurrency)
+    limiter.enabled = False
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(async_url(f"sqlite:///{path}"))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    # Login and the refresh-token insert run on the async session
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    with SessionLocal() as db:
+        crud.create_employee(db, name="Bench", email=EMAIL, department="Perf",
+                             joining_date=date.today(), password=PASSWORD)
+
+    try:
+        elapsed = asyncio.run(run(args.requests, args.concurrency, async_engine))
+    finally:
+        hashing.shutdown_executor()
+        engine.dispose()
+        os.remove(path)
+
+    print(f"workers={args.workers} concurrency={args.concurrency} "
+          f"requests={args.requests} elapsed={elapsed:.2f}s "
+          f"throughput={args.requests / elapsed:.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
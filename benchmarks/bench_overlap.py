@@ -0,0 +1,68 @@
+"""
+has_overlapping_leave latency as an employee's leave history grows.
+
+Seeds one employee with N historical leaves per size and times the
+overlap check for a new range. With ix_leave_requests_overlap the
+per-call latency should stay flat; --no-index drops it for comparison.
+
+    python -m benchmarks.bench_overlap
+    python -m benchmarks.bench_overlap --no-index
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.database import Base
+
+
+def seed(db: Session, history: int) -> int:
+    emp = models.Employee(name="Long Tenure", email=f"tenure{history}@example.com", department="Ops",
+                          joining_date=date(1990, 1, 1), leave_balance=10**6, password_hash="x")
+    db.add(emp)
+    db.flush()
+    statuses = [models.LeaveStatus.approved, models.LeaveStatus.rejected, models.LeaveStatus.applied]
+    start = date(1990, 1, 1)
+    rows = []
+    for i in range(history):
+        begin = start + timedelta(days=7 * i)
+        rows.append({"employee_id": emp.id, "start_date": begin, "end_date": begin + timedelta(days=2),
+                     "num_days": 3, "status": statuses[i % 3]})
+    if rows:
+        db.execute(insert(models.LeaveRequest), rows)
+    db.commit()
+    return emp.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--no-index", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    if args.no_index:
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_leave_requests_overlap"))
+
+    # A new request after the whole history, like a real upcoming leave
+    probe_start = date(1990, 1, 1) + timedelta(days=7 * max(args.sizes) + 30)
+    probe_end = probe_start + timedelta(days=4)
+    print(f"{'history':>8} {'us/call':>10}")
+    with Session(engine) as db:
+        for size in args.sizes:
+            employee_id = seed(db, size)
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                crud.has_overlapping_leave(db, employee_id, probe_start, probe_end)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>8} {elapsed / args.calls * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Concurrent apply/approve/read load against SQLite: default vs tuned engine.
+
+"default" is a plain create_engine (rollback journal, driver defaults);
+"tuned" is app.database.make_engine with the DB_POOL_* settings and the
+WAL / synchronous / busy_timeout / mmap pragmas. Each thread applies a
+leave for its own employee, approves it and reads its leave list.
+
+    python -m benchmarks.bench_pool
+    python -m benchmarks.bench_pool --threads 16 --ops 100
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base, make_engine, pool_metrics
+
+
+def seed(SessionLocal, threads: int):
+    with SessionLocal() as db:
+        employees = [
+            models.Employee(name=f"Load {i}", email=f"load{i}@example.com", department="Perf",
+                            joining_date=date(2000, 1, 1), leave_balance=10**6, password_hash="x")
+            for i in range(threads)
+        ]
+        db.add_all(employees)
+        db.commit()
+        return [e.id for e in employees]
+
+
+def worker(SessionLocal, employee_id: int, ops: int, errors: list):
+    # A Monday: every leave is a Mon-Tue pair, never a weekend the apply would refuse
+    start = date(2001, 1, 1)
+    for i in range(ops):
+        begin = start + timedelta(weeks=i)
+        try:
+            with SessionLocal() as db:
+                employee = crud.get_employee(db, employee_id)
+                leave = crud.apply_leave(db, employee, begin, begin + timedelta(days=1))
+                crud.approve_leave(db, leave)
+                crud.list_leaves_for_employee(db, employee_id, limit=20)
+        except (exc.OperationalError, exc.TimeoutError, ValueError) as e:
+            errors.append(type(e).__name__)
+
+
+def run(label: str, engine, threads: int, ops: int):
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ids = seed(SessionLocal, threads)
+    errors = []
+    pool = [threading.Thread(target=worker, args=(SessionLocal, i, ops, errors)) for i in ids]
+
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    done = threads * ops - len(errors)
+    line = f"{label:>8} ops={done:>6} errors={len(errors):>4} elapsed={elapsed:6.2f}s throughput={done / elapsed:7.1f} ops/s"
+    metrics = pool_metrics.get(label)
+    if metrics is not None:
+        stats = metrics.stats()
+        line += f" pool_wait_avg={stats['wait_seconds_avg'] * 1000:.2f}ms pool_wait_max={stats['wait_seconds_max'] * 1000:.1f}ms"
+    print(line)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="lms-bench-")
+    default_url = f"sqlite:///{os.path.join(tmpdir, 'default.db')}"
+    tuned_url = f"sqlite:///{os.path.join(tmpdir, 'tuned.db')}"
+
+    run("default", create_engine(default_url, connect_args={"check_same_thread": False}), args.threads, args.ops)
+    run("tuned", make_engine(tuned_url, name="tuned"), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Cost of one rate-limit check (sliding-window counter) per storage backend.
+
+Cycles through --keys distinct keys so the LRU and the SQLite table stay at
+their working size, as under a credential-stuffing run.
+
+    python -m benchmarks.bench_ratelimit
+    python -m benchmarks.bench_ratelimit --keys 200000 --checks 100000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.ratelimit import LRUMemoryStorage, SQLiteStorage
+
+
+def bench(name, storage, keys: int, checks: int):
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("5/minute")
+    for i in range(min(keys, checks)):
+        limiter.hit(limit, "login", f"user{i}@example.com")
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(limit, "login", f"user{i % keys}@example.com")
+    elapsed = time.perf_counter() - started
+    print(f"{name:>22}: {elapsed / checks * 1e6:7.1f} us/check")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=50000)
+    parser.add_argument("--checks", type=int, default=50000)
+    args = parser.parse_args()
+
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    workdir = tempfile.mkdtemp(prefix="lms-rl-", dir=directory)
+    path = os.path.join(workdir, "rl.db")
+    bench("limits memory://", MemoryStorage(), args.keys, args.checks)
+    bench("lru-memory://", LRUMemoryStorage("lru-memory://"), args.keys, args.checks)
+    bench("sqlite:// (tmpfs)" if directory else "sqlite://", SQLiteStorage(f"sqlite:///{path}"), args.keys, args.checks)
+    shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
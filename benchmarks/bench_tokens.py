@@ -0,0 +1,57 @@
+"""
+Access-token encode / verify throughput per codec, and through decode_token.
+
+"cold" verifies a fresh token every call (signature and claims checked);
+"cached" re-presents the same --tokens bearer tokens, as clients do between
+refreshes, so decode_token answers from the verified-token cache.
+
+    python -m benchmarks.bench_tokens
+    python -m benchmarks.bench_tokens --calls 100000 --tokens 1000
+"""
+import argparse
+import time
+
+from app import auth
+from app.config import settings
+
+
+def rate(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return calls / (time.perf_counter() - started)
+
+
+def claims(i: int) -> dict:
+    return {"sub": f"user{i}@example.com", "id": i, "role": "employee", "is_active": True,
+            "iat": time.time(), "exp": int(time.time()) + 900}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=500, help="distinct bearer tokens in the cached run")
+    args = parser.parse_args()
+
+    print(f"{'codec':>8} {'encode/s':>10} {'verify/s':>10}")
+    for name, codec_class in auth.TOKEN_CODECS.items():
+        try:
+            codec = codec_class(settings.SECRET_KEY, settings.ALGORITHM)
+        except RuntimeError as exc:
+            print(f"{name:>8}  skipped: {exc}")
+            continue
+        tokens = [codec.encode(claims(i)) for i in range(args.calls)]
+        encode = rate(lambda i: codec.encode(claims(i)), args.calls)
+        verify = rate(lambda i: codec.decode(tokens[i]), args.calls)
+        print(f"{name:>8} {encode:>10.0f} {verify:>10.0f}")
+
+    # The same path get_current_user takes, with the configured backend
+    tokens = [auth.create_access_token({"sub": f"user{i}@example.com"}) for i in range(args.calls)]
+    auth.token_cache.clear()
+    cold = rate(lambda i: auth.decode_token(tokens[i]), args.calls)
+    cached = rate(lambda i: auth.decode_token(tokens[i % args.tokens]), args.calls)
+    print(f"decode_token ({settings.TOKEN_BACKEND}): cold {cold:.0f}/s, cached {cached:.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
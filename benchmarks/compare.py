@@ -0,0 +1,115 @@
+"""
+Compare load/micro/importtime JSON reports against the checked-in baseline.
+
+Every timing (*_ms, us_per_op) may grow and every throughput_rps may shrink
+by at most --tolerance (a fraction) before it counts as a regression. Failed
+requests get no tolerance: any rise in an errors count or in its error_rate
+(errors / count) is a regression. The command exits 1 if any metric
+regressed. Other counts and configs are ignored.
+
+    python -m benchmarks.load --output load.json
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.compare load.json micro.json
+    python -m benchmarks.compare load.json micro.json --update-baseline
+
+Baselines are machine specific: refresh benchmarks/baseline.json on the
+machine that runs the comparison, with the same benchmark options.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+LOWER_IS_BETTER = ("_ms", "us_per_op")
+HIGHER_IS_BETTER = ("throughput_rps",)
+NO_TOLERANCE = ("errors", "error_rate")
+
+
+def flatten(report: dict) -> Dict[str, float]:
+    """{"load.operations.apply.p95_ms": 12.3, "load.operations.apply.error_rate": 0.02, ...}"""
+    metrics: Dict[str, float] = {}
+
+    def walk(prefix: str, node):
+        if isinstance(node, dict):
+            if "errors" in node and "count" in node:
+                metrics[f"{prefix}.error_rate"] = node["errors"] / node["count"] if node["count"] else 0.0
+            for key, value in node.items():
+                if key != "config":
+                    walk(f"{prefix}.{key}", value)
+        elif isinstance(node, (int, float)) and prefix.endswith(LOWER_IS_BETTER + HIGHER_IS_BETTER + NO_TOLERANCE):
+            metrics[prefix] = float(node)
+
+    walk(report["suite"], report)
+    return metrics
+
+
+def load_reports(paths: Iterable[str]) -> Dict[str, dict]:
+    reports = {}
+    for path in paths:
+        with open(path) as f:
+            report = json.load(f)
+        reports[report["suite"]] = report
+    return reports
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], tolerance: float):
+    """Yield (metric, baseline, current, change, regressed) for every metric present in both."""
+    for metric in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[metric], current[metric]
+        if before:
+            change = (after - before) / before
+        else:
+            change = float("inf") if after > before else 0.0
+        if metric.endswith(NO_TOLERANCE):
+            regressed = after > before
+        elif metric.endswith(HIGHER_IS_BETTER):
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        yield metric, before, after, change, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("reports", nargs="+", help="JSON written by benchmarks.load / micro / bench_importtime --output")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional change (default 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these reports as the new baseline")
+    args = parser.parse_args()
+
+    reports = load_reports(args.reports)
+    if args.update_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)
+        stored.update(reports)
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"baseline updated: {', '.join(sorted(reports))}")
+        return
+
+    with open(args.baseline) as f:
+        baseline_reports = json.load(f)
+    regressions = 0
+    for suite, report in sorted(reports.items()):
+        if suite not in baseline_reports:
+            print(f"{suite}: no baseline, skipped")
+            continue
+        if report.get("config") != baseline_reports[suite].get("config"):
+            print(f"{suite}: warning: options differ from the baseline run")
+        for metric, before, after, change, regressed in compare(flatten(baseline_reports[suite]), flatten(report), args.tolerance):
+            regressions += regressed
+            flag = "REGRESSED" if regressed else ""
+            print(f"{metric:<55} {before:>12.3f} {after:>12.3f} {change:>+8.1%} {flag}")
+    if regressions:
+        print(f"{regressions} metric(s) regressed (tolerance {args.tolerance:.0%}, none for errors)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+In-process load test of the auth and leave workflows.
+
+Seeds --employees employees and --leaves historical leaves through crud into
+a throwaway SQLite file, logs in --users virtual employees plus a manager, then
+drives --requests requests through the ASGI app with httpx's ASGITransport at
+--concurrency. The mix is weighted (--mix "login=5,refresh=10,...") over:
+
+    login    POST /auth/token                  (argon2 verify)
+    refresh  POST /auth/refresh                (rotation)
+    apply    POST /leave/apply                 (next free future week)
+    approve  PUT  /leave/{id}/approve          (manager, oldest pending)
+    list     GET  /leave/employee/{id}
+
+Prints (or --output writes) JSON: p50/p95/p99 latency and throughput per
+operation and overall. Rate limiting is disabled and query budgets are off
+for the run.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --employees 10000 --leaves 200000 --concurrency 64 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+from datetime import date, timedelta
+from typing import Dict, List
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import hashing
+from app.config import settings
+from app.database import Base, get_async_db, get_db, get_read_db, make_async_engine, make_engine
+from app.main import app, limiter
+from benchmarks.seed import MANAGER_EMAIL, PASSWORD, employee_email, seed
+
+DEFAULT_MIX = "login=5,refresh=10,apply=20,approve=15,list=50"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+class VirtualUser:
+    def __init__(self, employee_id: int, email: str, slot: int):
+        self.employee_id = employee_id
+        self.email = email
+        self.headers: Dict[str, str] = {}
+        self.refresh_token = ""
+        # Future Mondays, one per apply, so applies never overlap
+        self.next_week = date(2031, 1, 6) + timedelta(weeks=slot * 1000)
+
+    def take_week(self) -> date:
+        week = self.next_week
+        self.next_week += timedelta(weeks=1)
+        return week
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/auth/token", data={"username": email, "password": PASSWORD})
+
+
+async def run(args, mix: Dict[str, int], async_engine) -> dict:
+    try:
+        return await drive(args, mix)
+    finally:
+        # aiosqlite connection threads would otherwise keep the interpreter alive
+        await async_engine.dispose()
+
+
+async def drive(args, mix: Dict[str, int]) -> dict:
+    rng = random.Random(11)
+    # An unhandled app error is a 500 in the report, not an aborted run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        users = [VirtualUser(i + 2, employee_email(i), slot) for slot, i in enumerate(rng.sample(range(args.employees), args.users))]
+        for user in users:
+            tokens = (await login(client, user.email)).json()
+            user.headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            user.refresh_token = tokens["refresh_token"]
+        manager = {"Authorization": f"Bearer {(await login(client, MANAGER_EMAIL)).json()['access_token']}"}
+
+        pending: deque = deque()
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        operations, weights = zip(*mix.items())
+        plan = rng.choices(operations, weights=weights, k=args.requests)
+        queue = deque(enumerate(plan))
+
+        async def call(op: str, user: VirtualUser) -> httpx.Response:
+            if op == "login":
+                return await login(client, user.email)
+            if op == "refresh":
+                resp = await client.post("/auth/refresh", json={"refresh_token": user.refresh_token})
+                if resp.status_code == 200:
+                    user.refresh_token = resp.json()["refresh_token"]
+                return resp
+            if op == "apply":
+                start = user.take_week()
+                resp = await client.post("/leave/apply", headers=user.headers, json={
+                    "employee_id": user.employee_id, "start_date": str(start), "end_date": str(start + timedelta(days=1)),
+                })
+                if resp.status_code == 201:
+                    pending.append(resp.json()["id"])
+                return resp
+            if op == "approve" and pending:
+                return await client.put(f"/leave/{pending.popleft()}/approve", headers=manager)
+            return await client.get(f"/leave/employee/{user.employee_id}?limit=20", headers=user.headers)
+
+        async def worker(worker_id: int):
+            # Each worker owns its own users, so one user's refresh tokens are never rotated concurrently
+            own = users[worker_id::args.concurrency]
+            while queue:
+                n, op = queue.popleft()
+                user = own[n % len(own)]
+                if op == "approve" and not pending:
+                    op = "list"
+                started = time.perf_counter()
+                resp = await call(op, user)
+                latencies[op].append(time.perf_counter() - started)
+                if resp.status_code >= 400:
+                    errors[op] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    every = [latency for values in latencies.values() for latency in values]
+    return {
+        "suite": "load",
+        "config": {key: getattr(args, key) for key in ("employees", "leaves", "users", "requests", "concurrency")} | {"mix": mix},
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize(every, sum(errors.values()), elapsed),
+        "operations": {op: summarize(latencies[op], errors[op], elapsed) for op in sorted(latencies)},
+    }
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("login", "refresh", "apply", "approve", "list"):
+            raise SystemExit(f"unknown operation in --mix: {name}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--leaves", type=int, default=40_000)
+    parser.add_argument("--users", type=int, default=50, help="distinct employees driving the mix (at least --concurrency)")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    args.users = min(max(args.users, args.concurrency), args.employees)
+    mix = parse_mix(args.mix)
+
+    limiter.enabled = False
+    settings.QUERY_BUDGET_MODE = "off"
+    settings.HASH_POOL_MAX_PENDING = max(settings.HASH_POOL_MAX_PENDING, args.concurrency)
+
+    workdir = tempfile.mkdtemp(prefix="lms-load-")
+    url = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    engine = make_engine(url, name="load")
+    async_engine = make_async_engine(url, name="load_async")
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+
+    Base.metadata.create_all(engine)
+    try:
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            seed(db, args.employees, args.leaves)
+        print(f"seeded {args.employees} employees / {args.leaves} leaves in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        report = asyncio.run(run(args, mix, async_engine))
+    finally:
+        hashing.shutdown_executor()
+        engine.dispose()
+        shutil.rmtree(workdir)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmarks for the hot helpers behind the load test.
+
+    has_overlapping_leave   EXISTS probe for an employee with --history leaves
+    validate_password_*     strength check, accepted and rejected password
+    jwt_encode / jwt_decode access token round trip (decode_cached: verified-token cache)
+    employee_out / leave_page_out / balance_out   ORM -> schema -> JSON
+
+Each case runs for at least --min-seconds and reports microseconds per call
+as JSON (stdout or --output).
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --history 10000 --output micro.json
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import auth, crud, models, password_policy, schemas
+from app.database import Base
+
+
+def per_call_us(fn: Callable[[], object], min_seconds: float) -> float:
+    """Run fn in growing batches until one batch takes `min_seconds`; microseconds per call."""
+    fn()
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls * 1e6
+        calls *= 10 if elapsed < min_seconds / 10 else 2
+
+
+def seed_history(db: Session, history: int) -> models.Employee:
+    emp = models.Employee(name="Micro Bench", email="micro@example.com", department="Ops",
+                          joining_date=date(1990, 1, 1), leave_balance=10**6, password_hash="x")
+    db.add(emp)
+    db.flush()
+    statuses = [models.LeaveStatus.approved, models.LeaveStatus.rejected, models.LeaveStatus.applied]
+    crud.bulk_insert_leaves(db, [
+        {"employee_id": emp.id, "start_date": date(1990, 1, 1) + timedelta(days=7 * i),
+         "end_date": date(1990, 1, 3) + timedelta(days=7 * i), "num_days": 3, "status": statuses[i % 3]}
+        for i in range(history)
+    ])
+    return emp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=1000, help="leaves on the employee probed for overlaps")
+    parser.add_argument("--min-seconds", type=float, default=0.2)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        emp = seed_history(db, args.history)
+        leaves = crud.list_leaves_for_employee(db, emp.id, limit=20)
+        free = date(2030, 1, 7), date(2030, 1, 9)
+        token = auth.create_access_token({"sub": emp.email, "role": "employee"})
+        leave_page = TypeAdapter(list[schemas.LeaveOut])
+        balance = schemas.BalanceOut(employee_id=emp.id, leave_balance=20, pending_requests=1, pending_days=2, approved_days_ytd=5)
+
+        cases = {
+            "has_overlapping_leave": lambda: crud.has_overlapping_leave(db, emp.id, *free),
+            "validate_password_ok": lambda: password_policy.validate_password_strength("Str0ng!Passw0rd"),
+            "validate_password_rejected": lambda: _rejected("password123"),
+            "jwt_encode": lambda: auth.create_access_token({"sub": emp.email, "role": "employee"}),
+            "jwt_decode": lambda: auth.get_token_codec().decode(token),
+            "jwt_decode_cached": lambda: auth.decode_token(token),
+            "employee_out": lambda: schemas.EmployeeOut.model_validate(emp).model_dump_json(),
+            "leave_page_out": lambda: leave_page.dump_json(leaves),
+            "balance_out": lambda: balance.model_dump_json(),
+        }
+        results = {name: {"us_per_op": round(per_call_us(fn, args.min_seconds), 3)} for name, fn in cases.items()}
+
+    report = {"suite": "micro", "config": {"history": args.history}, "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def _rejected(password: str) -> None:
+    try:
+        password_policy.validate_password_strength(password)
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Bulk seeding through crud for the load and micro benchmarks.
+
+Employees share one precomputed argon2 hash (hashing 10k passwords would
+dominate setup); leaves are historical, non-overlapping and mostly decided,
+so the load mix can apply for future dates freely.
+"""
+import random
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from app import auth, crud, models
+
+PASSWORD = "Bench!Pass123"
+MANAGER_EMAIL = "manager@bench.example.com"
+
+
+def employee_email(i: int) -> str:
+    return f"user{i}@bench.example.com"
+
+
+def seed(db: Session, employees: int, leaves: int, batch_size: int = 5000, rng_seed: int = 7) -> None:
+    """`employees` employees plus one manager, and `leaves` leaves spread evenly across them."""
+    password_hash = auth.hash_password(PASSWORD)
+    crud.bulk_insert_employees(db, [{
+        "name": "Bench Manager", "email": MANAGER_EMAIL, "department": "Admin", "joining_date": date(2010, 1, 1),
+        "password_hash": password_hash, "role": models.Role.manager,
+    }])
+    for start in range(0, employees, batch_size):
+        crud.bulk_insert_employees(db, [
+            {"name": f"User {i}", "email": employee_email(i), "department": f"dept-{i % 20}",
+             "joining_date": date(2010, 1, 1), "password_hash": password_hash, "leave_balance": 100_000}
+            for i in range(start, min(employees, start + batch_size))
+        ])
+
+    # Manager is id 1, employees are 2..employees+1
+    rng = random.Random(rng_seed)
+    statuses = [models.LeaveStatus.approved] * 6 + [models.LeaveStatus.rejected] * 2 + [models.LeaveStatus.applied]
+    per_employee = max(1, leaves // max(employees, 1))
+    rows, inserted = [], 0
+    for employee_id in range(2, employees + 2):
+        day = date(2012, 1, 2)
+        for _ in range(min(per_employee, leaves - inserted - len(rows))):
+            day += timedelta(days=rng.randrange(7, 21))
+            rows.append({"employee_id": employee_id, "start_date": day, "end_date": day + timedelta(days=1),
+                         "num_days": 2, "status": rng.choice(statuses)})
+        if len(rows) >= batch_size:
+            crud.bulk_insert_leaves(db, rows)
+            inserted += len(rows)
+            rows = []
+    crud.bulk_insert_leaves(db, rows)
+    crud.rebuild_leave_summaries(db)
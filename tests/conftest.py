@@ -1,27 +1,44 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from datetime import date
 
-from app.main import app as fastapi_app
-from app.database import Base, get_db
-from sqlalchemy.pool import StaticPool
+from app.main import app as fastapi_app, limiter
+from app.database import Base, get_db, get_async_db, get_read_db, get_read_sessionmaker, async_url
 from app import crud,models
-
-# SQLALCHEMY_DATABASE_URL = "sqlite:///file::memory:?cache=shared"
-
-# engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "uri": True})
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+from app.config import settings
+from app.principals import principal_cache, revocations
+from app.leave_calendar import leave_calendar
+from app.workdays import business_calendar
+from app.analytics import summary_cache
+from app.response_cache import response_cache
+from app import metrics
+from app.auth import token_cache
+
+# A temporary file rather than :memory: so the sync engine (fixtures, import
+# endpoint) and the aiosqlite engine behind the async handlers see the same data.
+TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="lms-tests-"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,   # 👈 all sessions use same connection
 )
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs each request on a fresh event loop; NullPool avoids reusing
+# an aiosqlite connection across loops
+async_engine = create_async_engine(async_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -29,7 +46,20 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 fastapi_app.dependency_overrides[get_db] = override_get_db
+fastapi_app.dependency_overrides[get_async_db] = override_get_async_db
+fastapi_app.dependency_overrides[get_read_db] = override_get_async_db
+fastapi_app.dependency_overrides[get_read_sessionmaker] = lambda: TestingAsyncSessionLocal
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_test_db_dir():
+    yield
+    engine.dispose()
+    shutil.rmtree(os.path.dirname(TEST_DB_PATH), ignore_errors=True)
 
 @pytest.fixture(scope="function", autouse=True)
 def setup_db():
@@ -37,6 +67,50 @@ def setup_db():
     yield
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def reset_process_state():
+    # limiter and auth caches are process-wide; ids restart in every test DB
+    limiter.reset()
+    revocations.clear()
+    principal_cache.clear()
+    leave_calendar.clear()
+    business_calendar.clear()
+    summary_cache.clear()
+    response_cache.clear()
+    token_cache.clear()
+    metrics.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(monkeypatch):
+    # A route exceeding its budget in app/query_budget.py fails the test that hit it
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "raise")
+
+
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(3) as statements: ...
+    fails if the block runs more than 3 statements on the test engines, listing them.
+    """
+    @contextmanager
+    def guard(limit):
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        engines = (engine, async_engine.sync_engine)
+        for e in engines:
+            event.listen(e, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for e in engines:
+                event.remove(e, "after_cursor_execute", record)
+        assert len(statements) <= limit, f"{len(statements)} SQL statements (budget {limit}):\n" + "\n".join(statements)
+    return guard
+
+
 @pytest.fixture
 def client():
     return TestClient(fastapi_app)
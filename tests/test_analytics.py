@@ -0,0 +1,91 @@
+from datetime import date
+
+from app import crud
+from app.analytics import split_by_month
+from app.models import LeaveStatus
+from tests.conftest import TestingSessionLocal
+
+
+def manager_headers(client):
+    token = client.post("/auth/token", data={
+        "username": "manager@example.com", "password": "managerpass"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_leaves():
+    db = TestingSessionLocal()
+    ann = crud.create_employee(db, name="Ann", email="ann@example.com", department="IT",
+                               joining_date=date(2024, 1, 1), password_hash="x")
+    ben = crud.create_employee(db, name="Ben", email="ben@example.com", department="IT",
+                               joining_date=date(2024, 1, 1), password_hash="x")
+    # Mon 27 Jan .. Tue 4 Feb: 5 working days in January, 2 in February
+    crud.approve_leave(db, crud.apply_leave(db, ann, date(2025, 1, 27), date(2025, 2, 4)))
+    crud.apply_leave(db, ben, date(2025, 3, 3), date(2025, 3, 5))
+    ids = ann.id, ben.id
+    db.close()
+    return ids
+
+
+def _department(summary, name):
+    return next(d for d in summary["departments"] if d["department"] == name)
+
+
+def test_leave_summary_splits_months_and_counts_pending(client, seed_manager):
+    seed_leaves()
+    resp = client.get("/analytics/leave-summary", params={"year": 2025}, headers=manager_headers(client))
+    assert resp.status_code == 200
+
+    it = _department(resp.json(), "IT")
+    assert it["employees"] == 2
+    assert it["average_balance"] == (13 + 20) / 2
+    assert it["approved_days"] == 7
+    assert it["pending_days"] == 3
+    assert it["pending_requests"] == 1
+    months = it["months"]
+    assert [m["approved_days"] for m in months[:3]] == [5, 2, 0]
+    assert months[2]["pending_days"] == 3
+    # January 2025 has 23 working days for each of the 2 employees
+    assert months[0]["utilization"] == round(5 / 46, 4)
+
+    admin = _department(resp.json(), "Admin")
+    assert admin["employees"] == 1
+    assert admin["approved_days"] == 0
+
+
+def test_leave_summary_cache_is_cleared_by_leave_changes(client, seed_manager):
+    _, ben_id = seed_leaves()
+    headers = manager_headers(client)
+    params = {"year": 2025, "department": "IT"}
+    before = client.get("/analytics/leave-summary", params=params, headers=headers).json()
+    assert [d["department"] for d in before["departments"]] == ["IT"]
+
+    db = TestingSessionLocal()
+    leave = crud.list_leaves_for_employee(db, ben_id)[0]
+    crud.approve_leave(db, leave)
+    db.close()
+
+    after = client.get("/analytics/leave-summary", params=params, headers=headers).json()
+    assert _department(after, "IT")["approved_days"] == 10
+    assert _department(after, "IT")["pending_requests"] == 0
+
+
+def test_leave_summary_is_manager_only(client):
+    crud.create_employee(TestingSessionLocal(), name="Eve", email="eve@example.com", department="IT",
+                         joining_date=date(2024, 1, 1), password="Str0ng!Pass")
+    token = client.post("/auth/token", data={"username": "eve@example.com", "password": "Str0ng!Pass"}).json()["access_token"]
+    resp = client.get("/analytics/leave-summary", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 403
+
+
+def test_split_by_month_clips_to_the_year():
+    rows = [
+        ("IT", LeaveStatus.approved, date(2024, 12, 30), date(2025, 1, 3)),   # Mon..Fri across new year
+        ("IT", LeaveStatus.approved, date(2025, 12, 29), date(2026, 1, 2)),
+        ("HR", LeaveStatus.applied, date(2025, 4, 28), date(2025, 5, 2)),
+    ]
+    split = split_by_month(rows, 2025, holidays=[date(2025, 1, 1)])
+    it = split[("IT", LeaveStatus.approved)]
+    assert it[0] == 2 and it[11] == 3 and it.sum() == 5
+    hr = split[("HR", LeaveStatus.applied)]
+    assert hr[3] == 3 and hr[4] == 2
@@ -1,4 +1,11 @@
-from app import auth
+import sys
+import time
+
+import pytest
+
+from app import auth, crud
+from app.principals import revocations
+from tests.conftest import TestingSessionLocal
 
 
 def test_register_employee(client):
@@ -131,3 +138,158 @@ def test_token_expiry(client, monkeypatch):
 
     assert resp.status_code == 401
     assert resp.json()["detail"] == "Invalid Token"
+
+
+def test_register_fails_fast_when_hashing_pool_is_saturated(client, monkeypatch):
+    monkeypatch.setattr("app.config.settings.HASH_POOL_MAX_PENDING", 0)
+
+    response = client.post("/auth/register", json={
+        "name": "Busy",
+        "email": "busy@example.com",
+        "department": "Ops",
+        "joining_date": "2025-01-01",
+        "password": "Str0ng!Pass"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_with_thread_hashing(client, monkeypatch):
+    monkeypatch.setattr("app.config.settings.HASH_POOL_WORKERS", 0)
+
+    client.post("/auth/register", json={
+        "name": "Thread",
+        "email": "thread@example.com",
+        "department": "Ops",
+        "joining_date": "2025-01-01",
+        "password": "Str0ng!Pass"
+    })
+    response = client.post("/auth/token", data={
+        "username": "thread@example.com",
+        "password": "Str0ng!Pass"
+    })
+    assert response.status_code == 200
+    assert auth.decode_token(response.json()["access_token"])["sub"] == "thread@example.com"
+
+
+def _stateless_login(client, email="stateless@example.com"):
+    emp = client.post("/auth/register", json={
+        "name": "Stateless",
+        "email": email,
+        "department": "Ops",
+        "joining_date": "2025-01-01",
+        "password": "Str0ng!Pass"
+    }).json()
+    token = client.post("/auth/token", data={
+        "username": email, "password": "Str0ng!Pass"
+    }).json()["access_token"]
+    return emp, {"Authorization": f"Bearer {token}"}
+
+
+def test_access_token_embeds_authorization_claims(client):
+    emp, headers = _stateless_login(client)
+    payload = auth.decode_token(headers["Authorization"].split()[1])
+    assert payload["id"] == emp["id"]
+    assert payload["role"] == "employee"
+    assert payload["is_active"] is True
+
+
+def test_stateless_mode_refuses_deactivated_employee(client, monkeypatch):
+    monkeypatch.setattr("app.config.settings.AUTH_STATELESS", True)
+    monkeypatch.setattr("app.config.settings.REVOCATION_REFRESH_SECONDS", 0)
+    emp, headers = _stateless_login(client)
+
+    assert client.get(f"/employees/{emp['id']}/balance", headers=headers).status_code == 200
+
+    db = TestingSessionLocal()
+    crud.get_employee(db, emp["id"]).is_active = False
+    db.commit()
+    db.close()
+
+    resp = client.get(f"/employees/{emp['id']}/balance", headers=headers)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Inactive or not found"
+
+
+def test_stateless_mode_honours_explicit_revocation(client, monkeypatch):
+    monkeypatch.setattr("app.config.settings.AUTH_STATELESS", True)
+    emp, headers = _stateless_login(client)
+
+    revocations.revoke(emp["id"])
+
+    resp = client.get(f"/leave/employee/{emp['id']}", headers=headers)
+    assert resp.status_code == 401
+
+
+def test_stateless_mode_sees_revocations_from_other_processes(client, monkeypatch):
+    monkeypatch.setattr("app.config.settings.AUTH_STATELESS", True)
+    monkeypatch.setattr("app.config.settings.REVOCATION_REFRESH_SECONDS", 0)
+    emp, headers = _stateless_login(client)
+
+    # A role change handled by another worker: only the employees table knows
+    db = TestingSessionLocal()
+    crud.update_employee(db, crud.get_employee(db, emp["id"]), role="manager")
+    db.close()
+    revocations.clear()
+
+    resp = client.get(f"/leave/employee/{emp['id']}", headers=headers)
+    assert resp.status_code == 401
+
+
+def test_token_codecs_are_interchangeable():
+    claims = {"sub": "codec@example.com", "id": 7, "role": "employee", "is_active": True, "iat": 1.5, "exp": 4102444800}
+    hmac_codec = auth.HMACCodec("secret_key", "HS256")
+    jose_codec = auth.JoseCodec("secret_key", "HS256")
+    assert jose_codec.decode(hmac_codec.encode(claims)) == claims
+    assert hmac_codec.decode(jose_codec.encode(claims)) == claims
+
+
+def test_hmac_codec_rejects_forged_and_expired_tokens():
+    codec = auth.HMACCodec("secret_key", "HS256")
+    token = codec.encode({"sub": "a@example.com", "exp": 4102444800})
+    header, claims, signature = token.split(".")
+
+    forged_claims = auth._b64encode(b'{"sub":"boss@example.com","exp":4102444800}').decode()
+    unsigned_header = auth._b64encode(b'{"alg":"none","typ":"JWT"}').decode()
+    for bad in (
+        f"{header}.{forged_claims}.{signature}",
+        f"{unsigned_header}.{claims}.",
+        auth.HMACCodec("other_key", "HS256").encode({"sub": "a@example.com"}),
+        codec.encode({"sub": "a@example.com", "exp": int(time.time()) - 1}),
+        codec.encode({"sub": "a@example.com", "nbf": int(time.time()) + 60}),
+        "not.a.token",
+        "two.segments",
+        "ünïcode.ä.ö",
+    ):
+        with pytest.raises(auth.TokenError):
+            codec.decode(bad)
+
+
+def test_verified_tokens_skip_signature_checks_until_the_key_changes(monkeypatch):
+    token = auth.create_access_token({"sub": "cached@example.com"})
+    assert auth.decode_token(token)["sub"] == "cached@example.com"
+    assert auth.decode_token(token)["sub"] == "cached@example.com"
+    assert auth.token_cache.stats()["hits"] == 1
+
+    # Callers get a copy; mutating it does not poison the cache
+    auth.decode_token(token)["sub"] = "someone@example.com"
+    assert auth.decode_token(token)["sub"] == "cached@example.com"
+
+    monkeypatch.setattr("app.config.settings.SECRET_KEY", "rotated")
+    assert auth.decode_token(token) is None
+
+
+def test_verified_token_cache_drops_expired_entries():
+    auth.token_cache.put("stale-token", {"sub": "late@example.com", "exp": int(time.time()) - 1})
+    auth.token_cache.put("no-exp-token", {"sub": "forever@example.com"})
+
+    assert auth.token_cache.get("stale-token") is None
+    assert auth.token_cache.get("no-exp-token") is None
+    assert auth.token_cache.stats()["size"] == 0
+
+
+def test_pyjwt_backend_requires_pyjwt(monkeypatch):
+    monkeypatch.setitem(sys.modules, "jwt", None)
+    monkeypatch.setattr("app.config.settings.TOKEN_BACKEND", "pyjwt")
+    with pytest.raises(RuntimeError, match="PyJWT"):
+        auth.create_access_token({"sub": "x@example.com"})
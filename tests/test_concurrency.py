@@ -0,0 +1,160 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    # A real file so every thread gets its own connection, unlike the shared in-memory test DB
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def seed_leaves(Session, count, days_each):
+    with Session() as db:
+        emp = models.Employee(name="Stress", email="stress@example.com", department="Ops",
+                              joining_date=date(2025, 1, 1), leave_balance=20, password_hash="x")
+        db.add(emp)
+        db.flush()
+        leaves = [
+            models.LeaveRequest(employee_id=emp.id, start_date=date(2025, 2, 1) + timedelta(days=7 * i),
+                                end_date=date(2025, 2, 1) + timedelta(days=7 * i + days_each - 1),
+                                num_days=days_each, status=models.LeaveStatus.applied)
+            for i in range(count)
+        ]
+        db.add_all(leaves)
+        db.commit()
+        return emp.id, [leave.id for leave in leaves]
+
+
+def run_concurrently(Session, leave_ids, threads_per_leave=1):
+    barrier = threading.Barrier(len(leave_ids) * threads_per_leave)
+    outcomes = []
+    lock = threading.Lock()
+
+    def approve(leave_id):
+        db = Session()
+        try:
+            leave = crud.get_leave(db, leave_id)
+            barrier.wait()
+            try:
+                crud.approve_leave(db, leave)
+                result = "ok"
+            except ValueError as e:
+                result = str(e)
+        finally:
+            db.close()
+        with lock:
+            outcomes.append(result)
+
+    workers = [threading.Thread(target=approve, args=(leave_id,))
+               for leave_id in leave_ids for _ in range(threads_per_leave)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return outcomes
+
+
+def test_concurrent_approvals_never_lose_balance_updates(file_session_factory):
+    Session = file_session_factory
+    employee_id, leave_ids = seed_leaves(Session, count=10, days_each=3)
+
+    outcomes = run_concurrently(Session, leave_ids)
+
+    assert outcomes.count("ok") == 6
+    assert outcomes.count("Insufficient leave balance") == 4
+    with Session() as db:
+        assert crud.get_employee(db, employee_id).leave_balance == 2
+        approved_days = db.scalar(select(func.sum(models.LeaveRequest.num_days)).where(
+            models.LeaveRequest.status == models.LeaveStatus.approved))
+        assert approved_days == 18
+
+
+def test_same_leave_is_approved_exactly_once(file_session_factory):
+    Session = file_session_factory
+    employee_id, leave_ids = seed_leaves(Session, count=1, days_each=5)
+
+    outcomes = run_concurrently(Session, leave_ids, threads_per_leave=8)
+
+    assert outcomes.count("ok") == 1
+    assert outcomes.count("Cannot approve an already approved leave") == 7
+    with Session() as db:
+        assert crud.get_employee(db, employee_id).leave_balance == 15
+
+
+def test_concurrent_bulk_decisions_never_overspend_balance(file_session_factory):
+    Session = file_session_factory
+    employee_id, leave_ids = seed_leaves(Session, count=10, days_each=3)
+    # Each batch alone fits the balance of 20; together they would need 30 days
+    batches = [leave_ids[:5], leave_ids[5:]]
+    barrier = threading.Barrier(len(batches))
+    results = []
+    lock = threading.Lock()
+
+    def decide(ids):
+        db = Session()
+        try:
+            barrier.wait()
+            batch = crud.bulk_decide_leaves(db, [(leave_id, True) for leave_id in ids])
+        finally:
+            db.close()
+        with lock:
+            results.extend(batch)
+
+    workers = [threading.Thread(target=decide, args=(ids,)) for ids in batches]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    ok = [r for r in results if r["result"] == "ok"]
+    assert {r["result"] for r in results} <= {"ok", "skipped", "insufficient_balance"}
+    with Session() as db:
+        balance = crud.get_employee(db, employee_id).leave_balance
+        approved_days = db.scalar(select(func.sum(models.LeaveRequest.num_days)).where(
+            models.LeaveRequest.status == models.LeaveStatus.approved))
+    assert balance >= 0
+    assert approved_days == 3 * len(ok) == 20 - balance
+
+
+def test_concurrent_decisions_create_the_summary_row_once(file_session_factory):
+    Session = file_session_factory
+    # seed_leaves writes no employee_leave_summary rows, like leaves from before the backfill
+    employee_id, leave_ids = seed_leaves(Session, count=6, days_each=2)
+    barrier = threading.Barrier(len(leave_ids))
+    errors = []
+
+    def decide(leave_id, approve):
+        db = Session()
+        try:
+            leave = crud.get_leave(db, leave_id)
+            barrier.wait()
+            (crud.approve_leave if approve else crud.reject_leave)(db, leave)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=decide, args=(leave_id, i % 2 == 0)) for i, leave_id in enumerate(leave_ids)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert errors == []
+    with Session() as db:
+        summary = db.execute(select(models.EmployeeLeaveSummary)).scalar_one()
+        assert (summary.employee_id, summary.year) == (employee_id, 2025)
+        assert (summary.approved_requests, summary.approved_days) == (3, 6)
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import exc
+
+from app.config import settings
+from app.database import async_url, make_engine, pool_metrics
+
+
+def test_async_url_maps_sync_drivers():
+    assert async_url("sqlite:///./lms.db") == "sqlite+aiosqlite:///./lms.db"
+    assert async_url("sqlite+pysqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    assert async_url("postgresql://u:p@db:5432/lms") == "postgresql+asyncpg://u:p@db:5432/lms"
+    assert async_url("postgresql+psycopg2://u:p@db/lms") == "postgresql+asyncpg://u:p@db/lms"
+
+
+def test_async_url_keeps_async_and_unknown_drivers():
+    assert async_url("postgresql+asyncpg://u:p@db/lms") == "postgresql+asyncpg://u:p@db/lms"
+    assert async_url("mysql+aiomysql://u:p@db/lms") == "mysql+aiomysql://u:p@db/lms"
+
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", name="test_pragmas")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+    engine.dispose()
+
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    engine = make_engine(f"sqlite:///{tmp_path / 'pool.db'}", name="test_pool")
+    metrics = pool_metrics["test_pool"]
+    metrics.reset()
+
+    held = engine.connect()
+    assert metrics.stats()["in_use"] == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    with engine.connect():
+        pass
+
+    stats = metrics.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["in_use"] == 0
+    engine.dispose()
+
+
+def test_pool_metrics_do_not_count_connect_errors_as_timeouts(tmp_path):
+    # The directory does not exist, so every connect attempt fails
+    engine = make_engine(f"sqlite:///{tmp_path / 'missing' / 'pool.db'}", name="test_pool_connect_error")
+    metrics = pool_metrics["test_pool_connect_error"]
+    metrics.reset()
+
+    with pytest.raises(exc.OperationalError):
+        engine.connect()
+
+    assert metrics.stats()["timeouts"] == 0
+    engine.dispose()
+
+
+def test_memory_sqlite_skips_pool_sizing():
+    engine = make_engine("sqlite://", name="test_memory")
+    assert "test_memory" not in pool_metrics
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT 1").scalar() == 1
@@ -1,3 +1,7 @@
+from app.models import Role
+from app.principals import Principal, PrincipalCache
+
+
 ## CREATE EMPLOYEE
 def test_manager_can_create_employee(client, seed_manager):
     # get token from seeded manager
@@ -244,3 +248,214 @@ def test_employee_cannot_list_employees(client):
     resp = client.get("/employees", headers=headers)
     assert resp.status_code == 403
 
+
+
+## UPDATE EMPLOYEE / PRINCIPAL CACHE
+def _manager_and_employee(client, seed_manager):
+    mgr_token = client.post("/auth/token", data={
+        "username": "manager@example.com", "password": "managerpass"
+    }).json()["access_token"]
+    emp = client.post("/auth/register", json={
+        "name": "Jade", "email": "jade@example.com", "department": "IT", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    }).json()
+    emp_token = client.post("/auth/token", data={
+        "username": "jade@example.com", "password": "Str0ng!Pass"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {mgr_token}"}, emp, {"Authorization": f"Bearer {emp_token}"}
+
+
+def test_principal_cache_serves_repeat_requests(client, seed_manager):
+    mgr_headers, emp, _ = _manager_and_employee(client, seed_manager)
+
+    for _ in range(3):
+        assert client.get(f"/employees/{emp['id']}", headers=mgr_headers).status_code == 200
+
+    stats = client.get("/admin/cache-stats", headers=mgr_headers).json()["principal_cache"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 3
+    assert stats["size"] == 1
+
+
+def test_pool_stats_manager_only(client, seed_manager):
+    mgr_headers, _, emp_headers = _manager_and_employee(client, seed_manager)
+    assert client.get("/admin/pool-stats", headers=emp_headers).status_code == 403
+
+    stats = client.get("/admin/pool-stats", headers=mgr_headers).json()
+    assert {"primary", "primary_async"} <= set(stats)
+    assert {"checkouts", "timeouts", "in_use", "wait_seconds_avg", "wait_seconds_max"} <= set(stats["primary"])
+
+
+def test_deactivation_invalidates_cached_principal(client, seed_manager):
+    mgr_headers, emp, emp_headers = _manager_and_employee(client, seed_manager)
+    assert client.get(f"/employees/{emp['id']}", headers=emp_headers).status_code == 200
+
+    resp = client.patch(f"/employees/{emp['id']}", json={"is_active": False}, headers=mgr_headers)
+    assert resp.status_code == 200
+    assert resp.json()["is_active"] is False
+
+    resp = client.get(f"/employees/{emp['id']}", headers=emp_headers)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Inactive or not found"
+
+
+def test_role_change_takes_effect_immediately(client, seed_manager):
+    mgr_headers, emp, emp_headers = _manager_and_employee(client, seed_manager)
+    assert client.get("/employees", headers=emp_headers).status_code == 403
+
+    client.patch(f"/employees/{emp['id']}", json={"role": "manager"}, headers=mgr_headers)
+
+    assert client.get("/employees", headers=emp_headers).status_code == 200
+
+
+def test_principal_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr("app.config.settings.PRINCIPAL_CACHE_SIZE", 2)
+    cache = PrincipalCache()
+    for i in range(3):
+        cache.put(f"u{i}@example.com", Principal(i, f"u{i}@example.com", Role.employee, True))
+
+    assert cache.get("u0@example.com") is None
+    assert cache.get("u2@example.com").id == 2
+    assert cache.stats()["evictions"] == 1
+
+
+## BULK IMPORT
+def _manager_headers(client):
+    token = client.post("/auth/token", data={
+        "username": "manager@example.com", "password": "managerpass"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_manager_can_import_employees_from_csv(client, seed_manager):
+    headers = _manager_headers(client)
+    csv_body = (
+        "name,email,department,joining_date,password,role\n"
+        "Kim,kim@example.com,IT,2025-01-01,Str0ng!Pass,employee\n"
+        "Lee,lee@example.com,HR,2025-01-02,Str0ng!Pass,manager\n"
+        "Bad,not-an-email,HR,2025-01-02,Str0ng!Pass,employee\n"
+        "Kim2,kim@example.com,IT,2025-01-01,Str0ng!Pass,employee\n"
+        "Boss,manager@example.com,Admin,2025-01-01,Str0ng!Pass,manager\n"
+    )
+    resp = client.post("/employees/import", files={"file": ("staff.csv", csv_body, "text/csv")}, headers=headers)
+
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["created"] == 2
+    errors = {e["row"]: e["error"] for e in report["errors"]}
+    assert set(errors) == {3, 4, 5}
+    assert "email" in errors[3]
+    assert errors[4] == "Duplicate email in upload"
+    assert errors[5] == "Email already exist"
+
+    listed = client.get("/employees", headers=headers).json()
+    assert {e["email"] for e in listed} == {"manager@example.com", "kim@example.com", "lee@example.com"}
+    # imported credentials work
+    assert client.post("/auth/token", data={"username": "lee@example.com", "password": "Str0ng!Pass"}).status_code == 200
+
+
+def test_import_ndjson_in_small_chunks(client, seed_manager, monkeypatch):
+    monkeypatch.setattr("app.config.settings.IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr("app.config.settings.HASH_IMPORT_POOL_WORKERS", 0)
+    headers = _manager_headers(client)
+    lines = [
+        '{"name": "N%d", "email": "n%d@example.com", "department": "Ops", "joining_date": "2025-01-01", "password": "Str0ng!Pass"}' % (i, i)
+        for i in range(5)
+    ]
+    lines.insert(2, "{not json")
+    resp = client.post("/employees/import", files={"file": ("staff.ndjson", "\n".join(lines), "application/x-ndjson")}, headers=headers)
+
+    report = resp.json()
+    assert report["created"] == 5
+    assert [e["row"] for e in report["errors"]] == [3]
+
+
+def test_import_does_not_hash_on_the_login_pool(client, seed_manager, monkeypatch):
+    monkeypatch.setattr("app.config.settings.HASH_IMPORT_POOL_WORKERS", 0)
+    headers = _manager_headers(client)
+
+    def login_pool():
+        raise AssertionError("bulk import must not queue work on the login hashing pool")
+    monkeypatch.setattr("app.hashing.get_executor", login_pool)
+    lines = [
+        '{"name": "P%d", "email": "p%d@example.com", "department": "Ops", "joining_date": "2025-01-01", "password": "Str0ng!Pass"}' % (i, i)
+        for i in range(3)
+    ]
+    resp = client.post("/employees/import", files={"file": ("staff.ndjson", "\n".join(lines), "application/x-ndjson")}, headers=headers)
+    assert resp.json()["created"] == 3
+
+
+def test_employee_cannot_import(client):
+    client.post("/auth/register", json={
+        "name": "Mia", "email": "mia@example.com", "department": "QA", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    })
+    token = client.post("/auth/token", data={"username": "mia@example.com", "password": "Str0ng!Pass"}).json()["access_token"]
+    resp = client.post("/employees/import", files={"file": ("x.csv", "name\n", "text/csv")}, headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 403
+
+
+## CURSOR PAGINATION
+def test_list_employees_cursor_walks_every_row_once(client, seed_manager):
+    headers = _manager_headers(client)
+    for i in range(4):
+        client.post("/auth/register", json={
+            "name": f"Emp{i}", "email": f"emp{i}@example.com", "department": "Dept", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+        })
+
+    seen = []
+    resp = client.get("/employees?limit=2", headers=headers)
+    while True:
+        assert resp.status_code == 200
+        seen.extend(e["id"] for e in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        resp = client.get(f"/employees?limit=2&after={cursor}", headers=headers)
+
+    assert seen == sorted(seen)
+    assert len(seen) == 5
+
+
+def test_list_employees_rejects_tampered_cursor(client, seed_manager):
+    headers = _manager_headers(client)
+    resp = client.get("/employees?after=not-a-cursor", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid cursor"
+
+
+def test_conditional_get_returns_304_without_querying(client, seed_manager, monkeypatch):
+    mgr_headers, emp, _ = _manager_and_employee(client, seed_manager)
+    first = client.get(f"/employees/{emp['id']}", headers=mgr_headers)
+    assert first.status_code == 200
+    assert first.json()["email"] == "jade@example.com"
+    etag = first.headers["etag"]
+
+    async def no_db(*args, **kwargs):
+        raise AssertionError("cache hit should not query")
+    monkeypatch.setattr("app.crud_async.get_employee", no_db)
+
+    resp = client.get(f"/employees/{emp['id']}", headers={**mgr_headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+    # Without the header the cached bytes are served
+    assert client.get(f"/employees/{emp['id']}", headers=mgr_headers).json() == first.json()
+
+
+def test_employee_and_leave_changes_bump_the_etag(client, seed_manager):
+    mgr_headers, emp, emp_headers = _manager_and_employee(client, seed_manager)
+    employee_tag = client.get(f"/employees/{emp['id']}", headers=mgr_headers).headers["etag"]
+    balance = client.get(f"/employees/{emp['id']}/balance", headers=emp_headers)
+    assert balance.json()["pending_requests"] == 0
+
+    client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-03", "end_date": "2025-02-04"
+    }, headers=emp_headers)
+    resp = client.get(f"/employees/{emp['id']}/balance", headers={**emp_headers, "If-None-Match": balance.headers["etag"]})
+    assert resp.status_code == 200
+    assert resp.json()["pending_requests"] == 1
+    assert resp.headers["etag"] != balance.headers["etag"]
+
+    client.patch(f"/employees/{emp['id']}", json={"role": "manager"}, headers=mgr_headers)
+    resp = client.get(f"/employees/{emp['id']}", headers={**mgr_headers, "If-None-Match": employee_tag})
+    assert resp.status_code == 200
+    assert resp.json()["role"] == "manager"
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+
+from app import crud
+from tests.conftest import TestingSessionLocal
+
+
+def manager_headers(client):
+    token = client.post("/auth/token", data={
+        "username": "manager@example.com", "password": "managerpass"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_staff():
+    db = TestingSessionLocal()
+    alice = crud.create_employee(db, name="Alice", email="alice@example.com", department="IT",
+                                 joining_date=date(2024, 1, 1), password="Str0ng!Pass")
+    bob = crud.create_employee(db, name="Bob", email="bob@example.com", department="HR",
+                               joining_date=date(2025, 6, 1), password="Str0ng!Pass")
+    crud.apply_leave(db, alice, date(2025, 2, 1), date(2025, 2, 3))
+    crud.apply_leave(db, alice, date(2025, 5, 1), date(2025, 5, 2))
+    leave = crud.apply_leave(db, bob, date(2025, 7, 1), date(2025, 7, 1))
+    crud.reject_leave(db, leave)
+    db.close()
+
+
+def read_ndjson(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_export_employees_streams_ndjson(client, seed_manager):
+    seed_staff()
+    resp = client.get("/export/employees.ndjson", headers=manager_headers(client))
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = read_ndjson(resp)
+    assert [r["email"] for r in rows] == ["manager@example.com", "alice@example.com", "bob@example.com"]
+    assert rows[1]["joining_date"] == "2024-01-01"
+    assert rows[1]["role"] == "employee"
+    assert "password_hash" not in rows[1]
+
+
+def test_export_employees_filters(client, seed_manager, monkeypatch):
+    monkeypatch.setattr("app.config.settings.EXPORT_BATCH_SIZE", 1)
+    seed_staff()
+    headers = manager_headers(client)
+
+    rows = read_ndjson(client.get("/export/employees.ndjson?department=HR", headers=headers))
+    assert [r["name"] for r in rows] == ["Bob"]
+
+    rows = read_ndjson(client.get("/export/employees.ndjson?from=2024-01-01&to=2024-12-31", headers=headers))
+    assert [r["name"] for r in rows] == ["Alice"]
+
+
+def test_export_leaves_filters(client, seed_manager):
+    seed_staff()
+    headers = manager_headers(client)
+
+    rows = read_ndjson(client.get("/export/leaves.ndjson", headers=headers))
+    assert len(rows) == 3
+
+    rows = read_ndjson(client.get("/export/leaves.ndjson?department=IT&from=2025-02-03&to=2025-03-01", headers=headers))
+    assert [(r["start_date"], r["status"]) for r in rows] == [("2025-02-01", "applied")]
+
+    rows = read_ndjson(client.get("/export/leaves.ndjson?status=rejected", headers=headers))
+    assert [r["department"] for r in rows] == ["HR"]
+
+
+def test_employee_cannot_export(client):
+    client.post("/auth/register", json={
+        "name": "Ned", "email": "ned@example.com", "department": "QA", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    })
+    token = client.post("/auth/token", data={"username": "ned@example.com", "password": "Str0ng!Pass"}).json()["access_token"]
+    resp = client.get("/export/leaves.ndjson", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 403
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_loaded_by(module: str) -> set:
+    # A fresh interpreter: this one already has the whole app imported
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    return set(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split())
+
+
+@pytest.mark.parametrize("module", ["app.models", "app.schemas"])
+def test_models_and_schemas_import_without_the_auth_stack(module):
+    loaded = _modules_loaded_by(module)
+    assert not loaded & {"app.auth", "app.crud", "fastapi", "passlib", "jose", "numpy"}
+
+
+def test_app_startup_defers_password_hashing_and_jose():
+    loaded = _modules_loaded_by("app.main")
+    assert "app.main" in loaded
+    assert not loaded & {"passlib", "argon2", "jose"}
@@ -254,7 +254,7 @@ def test_leave_more_than_balance(client):
     response = client.post("/leave/apply", json={
         "employee_id": emp["id"],
         "start_date": "2025-02-01",
-        "end_date": "2025-02-25"
+        "end_date": "2025-03-05"
     }, headers=headers)
 
     assert response.status_code == 400
@@ -279,4 +279,281 @@ def test_overlapping_leaves(client):
     }, headers=headers)
 
     assert response.status_code == 400
-    assert response.json()['detail'] == "Overlapping leave request exists"
\ No newline at end of file
+    assert response.json()['detail'] == "Overlapping leave request exists"
+
+# --- BULK DECISION ---
+
+def test_bulk_decision_applies_all_items_in_one_batch(client, seed_manager):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    ids = []
+    for start, end in [("2025-02-03", "2025-02-07"), ("2025-03-03", "2025-03-05"), ("2025-04-01", "2025-04-02")]:
+        ids.append(client.post("/leave/apply", json={
+            "employee_id": emp["id"], "start_date": start, "end_date": end
+        }, headers=headers).json()["id"])
+
+    headers_mgr = manager_headers(client, seed_manager)
+    resp = client.post("/leave/bulk-decision", json={"items": [
+        {"leave_id": ids[0], "decision": "approve"},
+        {"leave_id": ids[1], "decision": "approve"},
+        {"leave_id": ids[2], "decision": "reject"},
+        {"leave_id": 999, "decision": "approve"},
+    ]}, headers=headers_mgr)
+
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["result"] for r in results] == ["ok", "ok", "ok", "not_found"]
+    assert [r["status"] for r in results[:3]] == ["approved", "approved", "rejected"]
+    assert results[0]["updated_leave_balance"] == 20 - 5 - 3
+
+    balance = client.get(f"/employees/{emp['id']}/balance", headers=headers).json()
+    assert balance["leave_balance"] == 12
+    assert (balance["pending_requests"], balance["pending_days"]) == (0, 0)
+
+
+def test_bulk_decision_reports_already_decided_and_insufficient_balance(client, seed_manager):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    first = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-03", "end_date": "2025-02-21"
+    }, headers=headers).json()["id"]
+    second = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-03-03", "end_date": "2025-03-14"
+    }, headers=headers).json()["id"]
+
+    headers_mgr = manager_headers(client, seed_manager)
+    resp = client.post("/leave/bulk-decision", json={"items": [
+        {"leave_id": first, "decision": "approve"},
+        {"leave_id": second, "decision": "approve"},
+        {"leave_id": first, "decision": "reject"},
+    ]}, headers=headers_mgr)
+
+    results = resp.json()
+    assert [r["result"] for r in results] == ["ok", "insufficient_balance", "already_approved"]
+    assert results[1]["status"] == "applied"
+    assert results[0]["updated_leave_balance"] == 5
+
+
+def test_employee_cannot_bulk_decide(client):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    resp = client.post("/leave/bulk-decision", json={"items": [{"leave_id": 1, "decision": "approve"}]}, headers=headers)
+    assert resp.status_code == 403
+
+
+# --- CURSOR PAGINATION ---
+
+def test_list_leaves_with_cursor(client):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    for month in ("02", "03", "04"):
+        client.post("/leave/apply", json={
+            "employee_id": emp["id"], "start_date": f"2025-{month}-03", "end_date": f"2025-{month}-04"
+        }, headers=headers)
+
+    first = client.get(f"/leave/employee/{emp['id']}?limit=2", headers=headers)
+    assert [l["start_date"] for l in first.json()] == ["2025-02-03", "2025-03-03"]
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/leave/employee/{emp['id']}?limit=2&after={cursor}", headers=headers)
+    assert [l["start_date"] for l in second.json()] == ["2025-04-03"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_list_leaves_rejects_skip_with_cursor(client):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    for month in ("02", "03"):
+        client.post("/leave/apply", json={
+            "employee_id": emp["id"], "start_date": f"2025-{month}-03", "end_date": f"2025-{month}-04"
+        }, headers=headers)
+    cursor = client.get(f"/leave/employee/{emp['id']}?limit=1", headers=headers).headers["X-Next-Cursor"]
+
+    resp = client.get(f"/leave/employee/{emp['id']}?limit=1&skip=1&after={cursor}", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "skip cannot be combined with after"
+
+
+def test_rejected_leave_does_not_block_overlapping_apply(client, seed_manager):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    leave = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-01", "end_date": "2025-02-05"
+    }, headers=headers).json()
+    client.put(f"/leave/{leave['id']}/reject", headers=manager_headers(client, seed_manager))
+
+    response = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-04", "end_date": "2025-02-07"
+    }, headers=headers)
+    assert response.status_code == 201
+
+
+# --- DEPARTMENT CALENDAR ---
+
+def test_department_calendar_tracks_apply_approve_reject(client, seed_manager):
+    mgr = manager_headers(client, seed_manager)
+    emp1, h1 = register_and_login_employee(client, "Cal One", "cal1@example.com", "Str0ng!Pass")
+    emp2, h2 = register_and_login_employee(client, "Cal Two", "cal2@example.com", "Str0ng!Pass")
+    params = {"from": "2025-03-01", "to": "2025-03-31"}
+
+    # Loads the (empty) department index; later writes update it in place
+    resp = client.get("/departments/Engineering/calendar", params=params, headers=mgr)
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+    l1 = client.post("/leave/apply", json={"employee_id": emp1["id"], "start_date": "2025-02-27", "end_date": "2025-03-02"}, headers=h1).json()
+    l2 = client.post("/leave/apply", json={"employee_id": emp2["id"], "start_date": "2025-03-10", "end_date": "2025-03-11"}, headers=h2).json()
+    client.post("/leave/apply", json={"employee_id": emp2["id"], "start_date": "2025-04-10", "end_date": "2025-04-11"}, headers=h2)
+
+    entries = client.get("/departments/Engineering/calendar", params=params, headers=mgr).json()
+    assert [(e["leave_id"], e["employee_name"], e["status"]) for e in entries] == [
+        (l1["id"], "Cal One", "applied"),
+        (l2["id"], "Cal Two", "applied"),
+    ]
+
+    client.put(f"/leave/{l1['id']}/approve", headers=mgr)
+    client.put(f"/leave/{l2['id']}/reject", headers=mgr)
+    entries = client.get("/departments/Engineering/calendar", params=params, headers=mgr).json()
+    assert [(e["leave_id"], e["status"]) for e in entries] == [(l1["id"], "approved")]
+
+    assert client.get("/departments/Sales/calendar", params=params, headers=mgr).json() == []
+
+
+def test_department_calendar_validates_range_and_role(client, seed_manager):
+    mgr = manager_headers(client, seed_manager)
+    _, headers = register_and_login_employee(client, "Cal", "cal@example.com", "Str0ng!Pass")
+    params = {"from": "2025-03-31", "to": "2025-03-01"}
+    assert client.get("/departments/Engineering/calendar", params=params, headers=mgr).status_code == 400
+    params = {"from": "2025-03-01", "to": "2025-03-31"}
+    assert client.get("/departments/Engineering/calendar", params=params, headers=headers).status_code == 403
+
+
+def test_leave_calendar_matches_brute_force():
+    import random
+    from datetime import timedelta
+    from app.leave_calendar import LeaveCalendar, CalendarEntry
+    from app.models import LeaveStatus
+
+    rng = random.Random(7)
+    base = date(2025, 1, 1)
+    rows = []
+    for leave_id in range(1, 501):
+        start = base + timedelta(days=rng.randrange(365))
+        rows.append((leave_id, leave_id % 40, "E", start, start + timedelta(days=rng.randrange(15)), LeaveStatus.applied))
+
+    calendar = LeaveCalendar()
+    calendar.begin_load("Ops")
+    # a write racing the initial load is replayed onto the loaded index
+    calendar.add("Ops", CalendarEntry(501, 1, "E", base, base + timedelta(days=40), LeaveStatus.applied))
+    calendar.discard(3)
+    calendar.load("Ops", rows)
+    expected = {r[0]: r for r in rows if r[0] != 3}
+    expected[501] = (501, 1, "E", base, base + timedelta(days=40), LeaveStatus.applied)
+
+    for _ in range(200):
+        lo = base + timedelta(days=rng.randrange(-20, 380))
+        hi = lo + timedelta(days=rng.randrange(30))
+        got = sorted(e.leave_id for e in calendar.query("Ops", lo, hi))
+        want = sorted(i for i, r in expected.items() if r[3] <= hi and r[4] >= lo)
+        assert got == want
+
+
+# --- WORKING DAYS ---
+
+def test_weekends_and_holidays_are_not_deducted(client, seed_manager):
+    mgr = manager_headers(client, seed_manager)
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+
+    # Fri 2025-02-07 .. Tue 2025-02-11 spans a weekend: 3 working days
+    resp = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-07", "end_date": "2025-02-11"
+    }, headers=headers)
+    assert resp.json()["num_days"] == 3
+
+    holiday = client.post("/holidays", json={"date": "2025-03-04", "name": "Founders Day"}, headers=mgr)
+    assert holiday.status_code == 201
+    assert client.post("/holidays", json={"date": "2025-03-04", "name": "Again"}, headers=mgr).status_code == 400
+
+    resp = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-03-03", "end_date": "2025-03-05"
+    }, headers=headers)
+    assert resp.json()["num_days"] == 2
+
+    assert client.delete(f"/holidays/{holiday.json()['id']}", headers=mgr).status_code == 200
+    resp = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-03-10", "end_date": "2025-03-12"
+    }, headers=headers)
+    assert resp.json()["num_days"] == 3
+
+
+def test_weekend_only_leave_is_rejected(client):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    resp = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-08", "end_date": "2025-02-09"
+    }, headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Leave range contains no working days"
+
+
+def test_business_calendar_matches_day_by_day_count():
+    from datetime import timedelta
+    from app.workdays import BusinessCalendar
+
+    holidays = {date(2024, 12, 25), date(2025, 1, 1), date(2026, 1, 1)}
+    loader = lambda region, year: [d for d in holidays if d.year == year]
+    calendar = BusinessCalendar()
+    start = date(2024, 12, 20)
+    for length in (0, 1, 6, 12, 45, 400):
+        end = start + timedelta(days=length)
+        expected = sum(
+            1 for i in range(length + 1)
+            if (start + timedelta(days=i)).weekday() < 5 and start + timedelta(days=i) not in holidays
+        )
+        assert calendar.count(start, end, "default", loader) == expected
+
+
+# --- LEAVE SUMMARY ---
+
+def _summary_rows():
+    from sqlalchemy import select
+    from app import models
+    from tests.conftest import TestingSessionLocal
+    with TestingSessionLocal() as db:
+        return db.execute(select(models.EmployeeLeaveSummary.__table__).order_by("employee_id", "year")).all()
+
+
+def test_balance_reports_pending_and_approved_totals(client, seed_manager):
+    from app import crud
+    from tests.conftest import TestingSessionLocal
+
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    ids = [
+        client.post("/leave/apply", json={"employee_id": emp["id"], "start_date": start, "end_date": end}, headers=headers).json()["id"]
+        for start, end in [("2025-02-03", "2025-02-05"), ("2025-03-03", "2025-03-04"), ("2025-04-07", "2025-04-11")]
+    ]
+    headers_mgr = manager_headers(client, seed_manager)
+    assert client.put(f"/leave/{ids[0]}/approve", headers=headers_mgr).status_code == 200
+    assert client.put(f"/leave/{ids[1]}/reject", headers=headers_mgr).status_code == 200
+
+    balance = client.get(f"/employees/{emp['id']}/balance", headers=headers).json()
+    assert balance["leave_balance"] == 17
+    assert (balance["pending_requests"], balance["pending_days"]) == (1, 5)
+    # Leaves count toward the year they start in
+    assert balance["approved_days_ytd"] == (3 if date.today().year == 2025 else 0)
+    with TestingSessionLocal() as db:
+        assert crud.get_balance(db, emp["id"], 2025).approved_days_ytd == 3
+
+
+def test_rebuild_leave_summaries_matches_incremental_updates(client, seed_manager):
+    from app import crud
+    from tests.conftest import TestingSessionLocal
+
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    ids = [
+        client.post("/leave/apply", json={"employee_id": emp["id"], "start_date": start, "end_date": end}, headers=headers).json()["id"]
+        for start, end in [("2024-12-30", "2025-01-03"), ("2025-02-03", "2025-02-05"), ("2025-03-03", "2025-03-04")]
+    ]
+    client.post("/leave/bulk-decision", json={"items": [
+        {"leave_id": ids[0], "decision": "approve"},
+        {"leave_id": ids[1], "decision": "reject"},
+    ]}, headers=manager_headers(client, seed_manager))
+
+    incremental = _summary_rows()
+    assert [(row.year, row.pending_requests, row.approved_days) for row in incremental] == [(2024, 0, 5), (2025, 1, 0)]
+    with TestingSessionLocal() as db:
+        assert crud.rebuild_leave_summaries(db) == 2
+    assert _summary_rows() == incremental
@@ -0,0 +1,52 @@
+import threading
+
+from app import metrics
+from tests.conftest import auth_header
+
+
+def _sample(text, series):
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_metrics_record_route_latency_and_sql_per_request(client, seed_manager):
+    headers = auth_header(client, "manager@example.com", "managerpass")
+    for _ in range(2):
+        assert client.get(f"/employees/{seed_manager.id}", headers=headers).status_code == 200
+    client.get("/employees/999999", headers=headers)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    route = 'method="GET",route="/employees/{employee_id}"'
+    assert _sample(text, f'lms_http_requests_total{{{route},status="200"}}') == 2
+    assert _sample(text, f'lms_http_requests_total{{{route},status="404"}}') == 1
+    assert _sample(text, f"lms_http_request_duration_seconds_count{{{route}}}") == 3
+    assert _sample(text, f'lms_http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 3
+    # the first read misses the response cache and queries; the repeat is served from memory
+    assert _sample(text, f"lms_http_request_db_statements_sum{{{route}}}") >= 2
+    assert _sample(text, f'lms_http_request_db_statements_bucket{{{route},le="0"}}') == 1
+    assert _sample(text, "lms_db_statements_total") > 0
+    # one verify for the login
+    assert _sample(text, "lms_password_verify_seconds_count") == 1
+
+
+def test_histogram_buckets_are_cumulative_and_shards_sum():
+    histogram = metrics.Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1))
+    threads = [
+        threading.Thread(target=lambda: [histogram.observe(v, "/x") for v in (0.05, 0.5, 5) * 1000])
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    lines = histogram.render()
+    assert 't_seconds_bucket{route="/x",le="0.1"} 4000' in lines
+    assert 't_seconds_bucket{route="/x",le="1"} 8000' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 12000' in lines
+    assert 't_seconds_count{route="/x"} 12000' in lines
@@ -0,0 +1,45 @@
+import logging
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app import query_budget
+from app.main import app
+from tests.conftest import auth_header
+from tests.test_leave import manager_headers, register_and_login_employee
+
+
+def test_every_route_declares_a_budget():
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    assert routes - set(query_budget.ROUTE_BUDGETS) == set()
+    assert set(query_budget.ROUTE_BUDGETS) - routes == set()
+
+
+def test_route_over_budget_fails_in_raise_mode(client, seed_manager, monkeypatch):
+    headers = auth_header(client, "manager@example.com", "managerpass")
+    monkeypatch.setitem(query_budget.ROUTE_BUDGETS, ("GET", "/employees/{employee_id}"), 0)
+    with pytest.raises(query_budget.QueryBudgetExceeded, match=r"GET /employees/\{employee_id\} issued \d+ SQL statements \(budget 0\)"):
+        client.get(f"/employees/{seed_manager.id}", headers=headers)
+
+
+def test_route_over_budget_is_logged_in_log_mode(client, seed_manager, monkeypatch, caplog):
+    monkeypatch.setattr("app.config.settings.QUERY_BUDGET_MODE", "log")
+    monkeypatch.setitem(query_budget.ROUTE_BUDGETS, ("GET", "/employees/{employee_id}"), 0)
+    headers = auth_header(client, "manager@example.com", "managerpass")
+    with caplog.at_level(logging.WARNING, logger="app.query_budget"):
+        assert client.get(f"/employees/{seed_manager.id}", headers=headers).status_code == 200
+    assert "budget 0" in caplog.text
+
+
+def test_approving_a_leave_stays_within_its_statements(client, seed_manager, query_budget):
+    emp, headers = register_and_login_employee(client, password="Str0ng!Pass")
+    leave_id = client.post("/leave/apply", json={
+        "employee_id": emp["id"], "start_date": "2025-02-03", "end_date": "2025-02-05"
+    }, headers=headers).json()["id"]
+    headers_mgr = manager_headers(client, seed_manager)
+
+    # principal lookup, get_leave, the compare-and-set UPDATE, the balance
+    # UPDATE ... RETURNING and the leave-summary upsert; nothing is re-read
+    with query_budget(5) as statements:
+        assert client.put(f"/leave/{leave_id}/approve", headers=headers_mgr).status_code == 200
+    assert [s.split()[0] for s in statements] == ["SELECT", "SELECT", "UPDATE", "UPDATE", "INSERT"]
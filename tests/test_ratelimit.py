@@ -0,0 +1,75 @@
+import pytest
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.ratelimit import LRUMemoryStorage, SQLiteStorage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "memory":
+        return LRUMemoryStorage("lru-memory://", max_keys=3)
+    return SQLiteStorage(f"sqlite:///{tmp_path / 'rl.db'}", max_keys=3, evict_every=1)
+
+
+def test_sliding_window_weights_the_previous_window(storage, monkeypatch):
+    clock = [6000.0]  # start of a 60s window
+    monkeypatch.setattr("app.ratelimit.time.time", lambda: clock[0])
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("4/minute")
+
+    assert all(limiter.hit(limit, "ip", "1.2.3.4") for _ in range(4))
+    assert not limiter.hit(limit, "ip", "1.2.3.4")
+    assert limiter.hit(limit, "ip", "5.6.7.8")
+
+    # Halfway through the next window half of the previous 4 still count
+    clock[0] += 90
+    assert limiter.hit(limit, "ip", "1.2.3.4")
+    assert limiter.hit(limit, "ip", "1.2.3.4")
+    assert not limiter.hit(limit, "ip", "1.2.3.4")
+    assert limiter.get_window_stats(limit, "ip", "1.2.3.4").remaining == 0
+
+    # Two windows later nothing is left
+    clock[0] += 120
+    assert limiter.get_window_stats(limit, "ip", "1.2.3.4").remaining == 4
+
+
+def test_idle_keys_are_evicted_least_recent_first(storage):
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("1/minute")
+    for key in ("a", "b", "c"):
+        assert limiter.hit(limit, key)
+    assert not limiter.hit(limit, "a")  # "a" is now the most recently hit
+
+    limiter.hit(limit, "d")
+    # "b" was evicted and starts over; "a" is still limited
+    assert limiter.hit(limit, "b")
+    assert not limiter.hit(limit, "a")
+
+
+def test_sqlite_counts_are_shared_between_instances(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'rl.db'}"
+    limit = parse("3/minute")
+    workers = [SlidingWindowCounterRateLimiter(SQLiteStorage(uri)) for _ in range(3)]
+    assert [worker.hit(limit, "alice@example.com") for worker in workers] == [True, True, True]
+    assert not workers[0].hit(limit, "alice@example.com")
+
+
+def test_login_is_limited_per_account(client, monkeypatch):
+    # Below the per-IP limit (5/minute), so the account limit is what refuses
+    monkeypatch.setattr("app.main.login_account_limit", parse("2/minute"))
+    for username in ("Victim@example.com", " victim@example.com"):
+        resp = client.post("/auth/token", data={"username": username, "password": "x"})
+        assert resp.status_code == 401
+    resp = client.post("/auth/token", data={"username": "victim@example.com", "password": "x"})
+    assert resp.status_code == 429
+    assert resp.json()["detail"] == "Too many login attempts. Please try again later."
+    assert client.post("/auth/token", data={"username": "other@example.com", "password": "x"}).status_code == 401
+
+
+def test_disabled_limiter_skips_the_account_limit(client, monkeypatch):
+    monkeypatch.setattr("app.main.login_account_limit", parse("2/minute"))
+    monkeypatch.setattr("app.main.limiter.enabled", False)
+    for _ in range(4):
+        resp = client.post("/auth/token", data={"username": "victim@example.com", "password": "x"})
+        assert resp.status_code == 401
@@ -1,4 +1,14 @@
-from datetime import date
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app as fastapi_app
+from app.models import RefreshToken
+from app.sweeper import RefreshTokenSweeper, refresh_token_sweeper
+from tests.conftest import TestingSessionLocal, TestingAsyncSessionLocal
 
 # --- Helpers ---
 def register_and_login_employee(client, email="alice@example.com", password="secret123"):
@@ -51,6 +61,77 @@ def test_refresh_with_invalid_token(client):
     assert response.json()["detail"] == "Invalid or expired refresh token"
 
 
+def test_rotation_keeps_one_live_token_per_session(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    old = tokens["refresh_token"]
+
+    new = client.post("/auth/refresh", json={"refresh_token": old}).json()["refresh_token"]
+    newer = client.post("/auth/refresh", json={"refresh_token": new}).json()["refresh_token"]
+
+    assert newer not in (old, new)
+    # Used tokens stay (until they expire) so a replay can be recognised
+    assert _count_refresh_tokens() == 3
+    assert _count_refresh_tokens(live=True) == 1
+
+
+def test_rotated_token_expires_after_reuse_window(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    db = TestingSessionLocal()
+    used = db.query(RefreshToken).filter(RefreshToken.used_at.is_not(None)).one()
+    db.close()
+    # The sweeper can purge it long before the session itself expires
+    assert used.expires_at - used.used_at == timedelta(seconds=settings.REFRESH_TOKEN_REUSE_WINDOW_SECONDS)
+
+
+def test_reusing_rotated_token_revokes_family(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    old = tokens["refresh_token"]
+    new = client.post("/auth/refresh", json={"refresh_token": old}).json()["refresh_token"]
+
+    # replaying the rotated token fails and also kills its successor
+    resp = client.post("/auth/refresh", json={"refresh_token": old})
+    assert resp.status_code == 401
+    resp = client.post("/auth/refresh", json={"refresh_token": new})
+    assert resp.status_code == 401
+    assert _count_refresh_tokens() == 0
+
+
+def test_reusing_any_earlier_token_revokes_family(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    t0 = tokens["refresh_token"]
+    t1 = client.post("/auth/refresh", json={"refresh_token": t0}).json()["refresh_token"]
+    t2 = client.post("/auth/refresh", json={"refresh_token": t1}).json()["refresh_token"]
+
+    # t0 was rotated away two refreshes ago; replaying it still kills the session
+    assert client.post("/auth/refresh", json={"refresh_token": t0}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": t2}).status_code == 401
+    assert _count_refresh_tokens() == 0
+
+
+def test_reuse_leaves_other_sessions_alone(client):
+    _, first = register_and_login_employee(client, password="Str0ng!Pass")
+    second = client.post("/auth/token", data={"username": "alice@example.com", "password": "Str0ng!Pass"}).json()
+
+    client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+
+    resp = client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]})
+    assert resp.status_code == 200
+
+
+def test_expired_refresh_token_is_rejected(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    db = TestingSessionLocal()
+    db.query(RefreshToken).update({RefreshToken.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+
+    resp = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert resp.status_code == 401
+
+
 def test_logout_revokes_refresh_token(client):
     _, tokens = register_and_login_employee(client)
     refresh_token = tokens["refresh_token"]
@@ -66,6 +147,14 @@ def test_logout_revokes_refresh_token(client):
     assert resp2.json()["detail"] == "Invalid or expired refresh token"
 
 
+def test_logout_after_rotation_ends_the_whole_session(client):
+    _, tokens = register_and_login_employee(client, password="Str0ng!Pass")
+    current = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()["refresh_token"]
+
+    assert client.post("/auth/logout", json={"refresh_token": current}).status_code == 200
+    assert _count_refresh_tokens() == 0
+
+
 def test_cannot_logout_with_invalid_token(client):
     resp = client.post("/auth/logout", json={"refresh_token": "fake-token"})
     assert resp.status_code == 401
@@ -103,3 +192,58 @@ def test_refresh_after_access_token_expired(client, monkeypatch):
     resp2 = client.get(f"/employees/{emp['id']}", headers=new_headers)
     assert resp2.status_code == 200
     assert resp2.json()["email"] == "alice@example.com"
+
+
+def _seed_refresh_tokens(expired: int, valid: int):
+    from app import crud
+    db = TestingSessionLocal()
+    emp = crud.create_employee(db, name="Sweep", email="sweep@example.com", department="Ops",
+                               joining_date=date.today(), password_hash="x")
+    now = datetime.utcnow()
+    for i in range(expired):
+        crud.create_refresh_token(db, user_id=emp.id, token_hash=f"expired-{i}", expires_at=now - timedelta(minutes=i + 1))
+    for i in range(valid):
+        crud.create_refresh_token(db, user_id=emp.id, token_hash=f"valid-{i}", expires_at=now + timedelta(days=1))
+    db.close()
+
+
+def _count_refresh_tokens(live: bool = False):
+    db = TestingSessionLocal()
+    try:
+        query = db.query(RefreshToken)
+        if live:
+            query = query.filter(RefreshToken.used_at.is_(None))
+        return query.count()
+    finally:
+        db.close()
+
+
+def test_sweeper_purges_expired_tokens_in_chunks(monkeypatch):
+    _seed_refresh_tokens(expired=5, valid=3)
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_SWEEP_BATCH_SIZE", 2)
+    sweeper = RefreshTokenSweeper(session_factory=TestingAsyncSessionLocal)
+
+    assert asyncio.run(sweeper.run_once()) == 5
+    assert _count_refresh_tokens() == 3
+
+    stats = sweeper.stats()
+    assert stats["runs"] == 1
+    assert stats["last_purged"] == 5
+    assert stats["last_batches"] == 3
+    assert stats["total_purged"] == 5
+
+    assert asyncio.run(sweeper.run_once()) == 0
+    assert sweeper.stats()["total_purged"] == 5
+
+
+def test_sweeper_runs_for_app_lifespan(monkeypatch):
+    _seed_refresh_tokens(expired=2, valid=1)
+    monkeypatch.setattr(refresh_token_sweeper, "session_factory", TestingAsyncSessionLocal)
+    runs = refresh_token_sweeper.runs
+    with TestClient(fastapi_app):
+        assert refresh_token_sweeper.running
+        deadline = time.monotonic() + 5
+        while refresh_token_sweeper.runs == runs and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert not refresh_token_sweeper.running
+    assert _count_refresh_tokens() == 1
@@ -0,0 +1,111 @@
+import os
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import crud
+from app.config import settings
+from app.database import Base, ReadRouter, async_url, get_read_db, get_read_sessionmaker, read_router
+from app.main import app as fastapi_app
+from tests.conftest import TEST_DB_PATH, TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """Two SQLite files standing in for lagging replicas, each holding one marker employee."""
+    engines, factories = [], []
+    for name in ("replica-a", "replica-b"):
+        url = f"sqlite:///{os.path.join(os.path.dirname(TEST_DB_PATH), name + '.db')}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            crud.create_employee(db, name=name, email=f"{name}@example.com", department="Ops",
+                                 joining_date=date(2024, 1, 1), password_hash="x")
+        engines.append(engine)
+        async_engine = create_async_engine(async_url(url), poolclass=NullPool)
+        factories.append(async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False))
+
+    monkeypatch.delitem(fastapi_app.dependency_overrides, get_read_db)
+    monkeypatch.delitem(fastapi_app.dependency_overrides, get_read_sessionmaker)
+    monkeypatch.setattr(read_router, "primary", TestingAsyncSessionLocal)
+    monkeypatch.setattr(read_router, "replicas", factories)
+    yield
+    for engine in engines:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _names(client, headers):
+    resp = client.get("/employees", headers=headers)
+    assert resp.status_code == 200
+    return {e["name"] for e in resp.json()}
+
+
+def test_reads_round_robin_across_replicas(client, seed_manager, replicas):
+    token = client.post("/auth/token", data={"username": "manager@example.com", "password": "managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    served = [_names(client, headers) for _ in range(4)]
+    assert {"replica-a"} in served and {"replica-b"} in served
+    assert served[0] != served[1] and served[0] == served[2]
+
+
+def test_reads_stick_to_primary_after_own_write(client, seed_manager, replicas):
+    token = client.post("/auth/token", data={"username": "manager@example.com", "password": "managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    emp = client.post("/employees", json={
+        "name": "Fresh Hire", "email": "fresh@example.com", "department": "IT", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    }, headers=headers)
+    assert emp.status_code == 201
+
+    # The replicas have not seen the new hire; the writer must
+    assert "Fresh Hire" in _names(client, headers)
+    assert "Fresh Hire" in _names(client, headers)
+
+
+def test_read_router_stickiness_follows_the_write_time(monkeypatch):
+    primary, replica = object(), object()
+    router = ReadRouter(primary, [replica])
+    assert router.session_factory(f"{time.time():.3f}") is primary
+    assert router.session_factory(f"{time.time() - 60:.3f}") is replica
+    assert router.session_factory(None) is replica
+    assert router.session_factory("garbage") is replica
+
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0)
+    assert router.session_factory(f"{time.time():.3f}") is replica
+
+
+def test_write_marker_is_carried_by_the_client(client, seed_manager, replicas):
+    token = client.post("/auth/token", data={"username": "manager@example.com", "password": "managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/employees", json={
+        "name": "Other Worker", "email": "other@example.com", "department": "IT", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    }, headers=headers)
+    marker = client.cookies.get(settings.READ_YOUR_WRITES_COOKIE)
+    assert marker is not None
+
+    # Another worker knows nothing of the write; only the cookie routes the read
+    client.cookies.clear()
+    assert "Other Worker" not in _names(client, headers)
+    client.cookies.set(settings.READ_YOUR_WRITES_COOKIE, marker)
+    assert "Other Worker" in _names(client, headers)
+
+
+def test_cached_employee_reads_are_filled_from_the_primary(client, seed_manager, replicas):
+    # Registration is not tied to a caller, so nothing pins the new employee's reads to the primary
+    emp = client.post("/auth/register", json={
+        "name": "Replica Lag", "email": "lag@example.com", "department": "IT", "joining_date": "2025-01-01", "password": "Str0ng!Pass"
+    }).json()
+    token = client.post("/auth/token", data={"username": "lag@example.com", "password": "Str0ng!Pass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Neither replica has the employee; a replica-filled cache would 404 or serve stale totals
+    assert client.get(f"/employees/{emp['id']}", headers=headers).status_code == 200
+    balance = client.get(f"/employees/{emp['id']}/balance", headers=headers)
+    assert balance.status_code == 200
+    assert balance.json()["pending_days"] == 0